@@ -1,7 +1,12 @@
-from ml.chat_model import ChatModel
+from ml.runtime import get_chat_model
 from schemas.chat_schema import ChatRequest
-from fastapi import APIRouter, status, HTTPException
-from redis_client.memory_manager import ChatMemoryManager
+from settings.settings import api_settings
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status, HTTPException
+from fastapi.responses import StreamingResponse
+from redis_client.memory_manager import AsyncChatMemoryManager
+from ml.chat_context import compact_history, load_context
+from observability.metrics import span
+import json
 import uuid
 from typing import Optional
 
@@ -9,29 +14,66 @@ router = APIRouter()
 
 
 @router.get("/check", status_code=status.HTTP_200_OK)
-async def check_user(session_id: Optional[str] = None):
-    memory = ChatMemoryManager()
+async def check_user(
+    session_id: Optional[str] = None,
+    before: Optional[int] = Query(default=None, ge=0),
+    limit: int = Query(default=api_settings.CHAT_HISTORY_PAGE_SIZE, ge=1, le=200),
+):
+    memory = AsyncChatMemoryManager()
 
-    if session_id and memory.session_exists(session_id):
-        history = memory.get_history(session_id)
+    if session_id:
+        history, next_cursor = await memory.get_page(session_id, limit, before)
 
-        return {"history": history, "session_id": session_id}
+        if history or before is not None:
+            return {
+                "history": history,
+                "session_id": session_id,
+                "next_cursor": next_cursor,
+            }
 
-    else:
-        session_id = uuid.uuid4()
+    session_id = uuid.uuid4()
 
-        return {"history": [], "session_id": session_id}
+    return {"history": [], "session_id": session_id, "next_cursor": None}
+
+
+@router.get("/session", status_code=status.HTTP_200_OK)
+async def session_info(session_id: str):
+    memory = AsyncChatMemoryManager()
+
+    stored, total = await memory.get_counts(session_id)
+
+    return {
+        "session_id": session_id,
+        "exists": stored > 0,
+        "message_count": stored,
+        "total_messages": total,
+    }
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def chat_model(request: ChatRequest):
-    memory = ChatMemoryManager()
+async def chat_model(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    chat=Depends(get_chat_model),
+):
+    memory = AsyncChatMemoryManager()
 
     try:
-        result = ChatModel().chat(user_input=request.message)
+        history = await load_context(memory, request.session_id)
+        result = await chat.chat(user_input=request.message, history=history)
 
-        memory.add_message(request.session_id, role="user", content=request.message)
-        memory.add_message(request.session_id, role="ai", content=result)
+        with span("redis_history_write"):
+            await memory.add_messages(
+                request.session_id,
+                [
+                    {"role": "user", "content": request.message},
+                    {"role": "ai", "content": result},
+                ],
+            )
+
+        background_tasks.add_task(
+            compact_history, memory, request.session_id, chat.summarize
+        )
 
         return {"response": result}
 
@@ -39,3 +81,49 @@ async def chat_model(request: ChatRequest):
         raise HTTPException(
             status_code=500, detail=f"Error generating response: {str(e)}"
         )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream", status_code=status.HTTP_200_OK)
+async def chat_stream(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    chat=Depends(get_chat_model),
+):
+    memory = AsyncChatMemoryManager()
+
+    async def events():
+        try:
+            history = await load_context(memory, request.session_id)
+
+            async for event, data in chat.stream(
+                user_input=request.message, history=history
+            ):
+                if event == "done":
+                    with span("redis_history_write"):
+                        await memory.add_messages(
+                            request.session_id,
+                            [
+                                {"role": "user", "content": request.message},
+                                {"role": "ai", "content": data["response"]},
+                            ],
+                        )
+
+                yield _sse(event, data)
+
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating response: {str(e)}"})
+
+    background_tasks.add_task(
+        compact_history, memory, request.session_id, chat.summarize
+    )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks,
+    )
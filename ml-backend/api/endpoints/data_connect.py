@@ -1,13 +1,24 @@
+import io
 import os
-import pandas as pd
+import time
+import asyncio
+import logging
 from fastapi import APIRouter,  Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
 from schemas.product import ProductData
 from db.product import Product
+from db.data_upload import DataUpload
+from redis.exceptions import RedisError
+from redis_client.data_version import DataVersion
+
+logger = logging.getLogger("sarah.data_connect")
 
 router = APIRouter()
 
+# Attempts at moving the cached data version after an upload.
+VERSION_ATTEMPTS = 3
+
 
 def get_db():
     db = SessionLocal()
@@ -25,10 +36,12 @@ async def data_connect(file: UploadFile = File(...), db: Session = Depends(get_d
     filename = file.filename
     extension = os.path.splitext(filename)[1].lower()
 
+    import pandas as pd
+
     try:
         contents = await file.read()
         if extension == ".csv":
-            df = pd.read_csv(pd.compat.StringIO(contents.decode("utf-8")))
+            df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
         elif extension in [".xls", ".xlsx"]:
             df = pd.read_excel(contents)
         else:
@@ -75,14 +88,51 @@ async def data_connect(file: UploadFile = File(...), db: Session = Depends(get_d
 
         db.bulk_save_objects(records_to_insert)
 
+        # Recorded in the same transaction, so the durable data version
+        # moves exactly when the data does.
+        upload = DataUpload(
+            Filename=filename, Rows=len(records_to_insert), Uploaded_At=time.time()
+        )
+        db.add(upload)
+
         db.commit()
 
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database insert failed: {str(e)}")
 
-    return {
+    response = {
         "filename": filename,
         "message": "Data uploaded and saved successfully.",
         "processed_rows": len(products_data),
+        "data_version": upload.id,
     }
+
+    if not await _advance_version(upload.id, upload.Uploaded_At):
+        # ETags and cache keys derive from the version alone, so until it
+        # moves, cached reads keep serving the data from before this upload.
+        response["message"] = (
+            "Data saved, but cached results could not be refreshed and may be "
+            "stale until the next upload or API restart."
+        )
+        response["warning"] = "data_version_not_updated"
+
+    return response
+
+
+async def _advance_version(version: int, updated_at: float) -> bool:
+    for attempt in range(VERSION_ATTEMPTS):
+        try:
+            await DataVersion().advance(version, updated_at)
+            return True
+        except RedisError:
+            logger.warning(
+                "Data version update failed (attempt %d of %d)",
+                attempt + 1,
+                VERSION_ATTEMPTS,
+                exc_info=True,
+            )
+            await asyncio.sleep(0.1 * 2**attempt)
+
+    logger.error("Data version stuck below %d; cached reads are stale", version)
+    return False
@@ -1,12 +1,14 @@
-import pandas as pd
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
 from fastapi import APIRouter, Depends, HTTPException, status
 from db.product import Product
 from typing import Optional
+import asyncio
 import httpx
 from sqlalchemy import func
-from ml.demand_forecasting import ChronosForecaster
+from ml.runtime import get_forecaster
+from schemas.forecast import UnitsForecastResponse, RevenueForecastResponse
+from observability.metrics import span
 
 router = APIRouter()
 
@@ -19,10 +21,16 @@ def get_db():
         db.close()
 
 
-@router.get("/units", status_code=status.HTTP_200_OK)
+@router.get(
+    "/units",
+    response_model=UnitsForecastResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def units_forecasting(
     product_id: Optional[str] = None, db: Session = Depends(get_db)
 ):
+    import pandas as pd
+
     try:
         products_name = (
             db.query(Product.Product_ID, Product.Product_Name)
@@ -47,16 +55,17 @@ async def units_forecasting(
                 .all()
             )
 
-            df = pd.DataFrame(
-                [
-                    {
-                        "product_id": "All",
-                        "period": row.Period,
-                        "units_sold": row.total_units_sold,
-                    }
-                    for row in monthly_sales
-                ]
-            )
+            with span("dataframe"):
+                df = pd.DataFrame(
+                    [
+                        {
+                            "product_id": "All",
+                            "period": row.Period,
+                            "units_sold": row.total_units_sold,
+                        }
+                        for row in monthly_sales
+                    ]
+                )
 
         else:
             products_list = (
@@ -71,16 +80,17 @@ async def units_forecasting(
                     status_code=404, detail=f"Product with ID '{product_id}' not found"
                 )
 
-            df = pd.DataFrame(
-                [
-                    {
-                        "product_id": p.Product_ID,
-                        "period": p.Period,
-                        "units_sold": p.Units_Sold,
-                    }
-                    for p in products_list
-                ]
-            )
+            with span("dataframe"):
+                df = pd.DataFrame(
+                    [
+                        {
+                            "product_id": p.Product_ID,
+                            "period": p.Period,
+                            "units_sold": p.Units_Sold,
+                        }
+                        for p in products_list
+                    ]
+                )
 
         if df.empty:
             raise HTTPException(status_code=404, detail="No data found")
@@ -92,7 +102,10 @@ async def units_forecasting(
         response_df = response_df.to_dict(orient="records")
 
         try:
-            response = await ChronosForecaster().predict_units(df=df)
+            # Judge staleness against the whole catalog, not this series alone.
+            as_of = db.query(func.max(Product.Period)).scalar()
+            forecaster = await asyncio.to_thread(get_forecaster)
+            response = await forecaster.predict_units(df=df, as_of=as_of)
 
             return {
                 "products_name": product_dict,
@@ -120,10 +133,16 @@ async def units_forecasting(
         )
 
 
-@router.get("/revenue", status_code=status.HTTP_200_OK)
+@router.get(
+    "/revenue",
+    response_model=RevenueForecastResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def revenue_forecasting(
     product_id: Optional[str] = None, db: Session = Depends(get_db)
 ):
+    import pandas as pd
+
     try:
         products_name = (
             db.query(Product.Product_ID, Product.Product_Name)
@@ -149,17 +168,18 @@ async def revenue_forecasting(
                 .all()
             )
 
-            df = pd.DataFrame(
-                [
-                    {
-                        "product_id": "All",
-                        "period": row.Period,
-                        "revenue": round(row.total_revenue, 2),
-                        "units_sold": row.total_units_sold,
-                    }
-                    for row in monthly_data
-                ]
-            )
+            with span("dataframe"):
+                df = pd.DataFrame(
+                    [
+                        {
+                            "product_id": "All",
+                            "period": row.Period,
+                            "revenue": round(row.total_revenue, 2),
+                            "units_sold": row.total_units_sold,
+                        }
+                        for row in monthly_data
+                    ]
+                )
 
         else:
             product_data = (
@@ -179,17 +199,18 @@ async def revenue_forecasting(
                     status_code=404, detail=f"Revenue with ID '{product_id}' not found"
                 )
 
-            df = pd.DataFrame(
-                [
-                    {
-                        "product_id": product_id,
-                        "period": row.Period,
-                        "revenue": round(row.Revenue, 2),
-                        "units_sold": row.Units_Sold,
-                    }
-                    for row in product_data
-                ]
-            )
+            with span("dataframe"):
+                df = pd.DataFrame(
+                    [
+                        {
+                            "product_id": product_id,
+                            "period": row.Period,
+                            "revenue": round(row.Revenue, 2),
+                            "units_sold": row.Units_Sold,
+                        }
+                        for row in product_data
+                    ]
+                )
 
         if df.empty:
             raise HTTPException(status_code=404, detail="No data found")
@@ -201,7 +222,10 @@ async def revenue_forecasting(
         response_df = response_df.to_dict(orient="records")
 
         try:
-            response = await ChronosForecaster().predict_revenue(df=df)
+            # Judge staleness against the whole catalog, not this series alone.
+            as_of = db.query(func.max(Product.Period)).scalar()
+            forecaster = await asyncio.to_thread(get_forecaster)
+            response = await forecaster.predict_revenue(df=df, as_of=as_of)
 
             return {
                 "products_name": product_dict,
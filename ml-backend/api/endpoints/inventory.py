@@ -1,17 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
-from crud.inventory import get_latest_products
-from ml.demand_forecasting import ChronosForecaster
+from crud.inventory import get_inventory_page, get_latest_products
+from ml.runtime import get_forecaster
 from db.product import Product
-import pandas as pd
+from schemas.product import (
+    InventoryItemResponse,
+    InventoryColumnsResponse,
+    InventoryPageResponse,
+)
+from typing import List, Literal, Optional, Union
+import asyncio
 from collections import defaultdict
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from ml.inventory_model import InventoryModel
+from ml.inventory_model import get_cached_insight, generate_insight
+from ml.inventory_prompt import build_inventory_prompt
+from observability.metrics import span
 
 router = APIRouter()
 
+INVENTORY_COLUMNS = [
+    "id",
+    "Product_ID",
+    "Product_Name",
+    "Category",
+    "Period",
+    "Current_Price",
+    "Opening_Price",
+    "Cost_Per_Unit",
+    "Units_Sold",
+    "Opening_Stock",
+    "Stock_Received",
+    "Revenue",
+    "Stock_On_Hand",
+]
+
 
 def get_db():
     db = SessionLocal()
@@ -45,15 +70,74 @@ def calculate_stockout_month(current_stock, forecasted_demand_3m, current_date=N
     return stockout_date.strftime("%b %Y")
 
 
-@router.get("/")
-def get_inventory(db: Session = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=List[InventoryItemResponse],
+    responses={200: {"model": Union[List[InventoryItemResponse], InventoryColumnsResponse]}},
+)
+def get_inventory(
+    layout: Literal["rows", "columnar"] = "rows", db: Session = Depends(get_db)
+):
     latest = get_latest_products(db)
 
+    if layout == "columnar":
+        # Arrays per field instead of one object per product; much smaller for
+        # large catalogs and serialized directly by orjson.
+        return ORJSONResponse(
+            {
+                "count": len(latest),
+                "columns": {
+                    column: [getattr(row, column) for row in latest]
+                    for column in INVENTORY_COLUMNS
+                },
+            }
+        )
+
     return latest
 
 
+@router.get("/items", response_model=InventoryPageResponse)
+def list_inventory(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: Literal["product_id", "stock_on_hand", "revenue"] = "product_id",
+    order: Literal["asc", "desc"] = "asc",
+    category: Optional[str] = None,
+    max_stock: Optional[int] = Query(
+        None, description="Only items with at most this much stock on hand"
+    ),
+    stockout_within: Optional[int] = Query(
+        None,
+        ge=1,
+        le=24,
+        description=(
+            "Only items whose stock on hand covers fewer than this many months "
+            "at their average sales over the last 3 periods. A sales-velocity "
+            "estimate, not the Chronos forecast behind predicted_stockout_month "
+            "in /inventory/insight, so the two can disagree"
+        ),
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = get_inventory_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            descending=order == "desc",
+            category=category,
+            max_stock=max_stock,
+            stockout_within=stockout_within,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
 @router.get("/insight")
-async def get_ai_insights(db: Session = Depends(get_db)):
+async def get_ai_insights(background: bool = False, db: Session = Depends(get_db)):
     current_inventory = get_latest_products(db)
 
     inventory = [
@@ -73,19 +157,28 @@ async def get_ai_insights(db: Session = Depends(get_db)):
 
     all_data = db.query(Product).all()
 
-    df = pd.DataFrame(
-        [
-            {
-                "product_id": row.Product_ID,
-                "period": row.Period,
-                "units_sold": row.Units_Sold,
-            }
-            for row in all_data
-        ]
-    )
+    import pandas as pd
+
+    # Only products still stocked in the latest period need a forecast;
+    # discontinued items would just add series to the model call.
+    current_ids = {item["product_id"] for item in inventory}
+
+    with span("dataframe"):
+        df = pd.DataFrame(
+            [
+                {
+                    "product_id": row.Product_ID,
+                    "period": row.Period,
+                    "units_sold": row.Units_Sold,
+                }
+                for row in all_data
+                if row.Product_ID in current_ids
+            ]
+        )
 
     try:
-        forecast = await ChronosForecaster().predict_units_raw(
+        forecaster = await asyncio.to_thread(get_forecaster)
+        forecast = await forecaster.predict_units_raw(
             df=df, prediction_length=3
         )
     except Exception as e:
@@ -116,12 +209,32 @@ async def get_ai_insights(db: Session = Depends(get_db)):
         )
         data["replenishment_needed"] = data["prediction_3m"] - data["stock_on_hand"]
 
+    prompt = build_inventory_prompt(inventory)
+
+    response = {
+        "inventory": inventory,
+        "summary": None,
+        "prompt_tokens": prompt.token_estimate,
+    }
+
     try:
-        summary = InventoryModel().inventory_insight(inventory=inventory)
+        key, summary = await get_cached_insight(inventory)
+
+        if summary is not None:
+            return {**response, "summary": summary, "summary_status": "cached"}
+
+        task = generate_insight(key, prompt.text)
+
+        # Return the numbers right away and let the summary finish in the
+        # background; the next request picks it up from the cache.
+        if background:
+            return {**response, "summary_status": "pending"}
+
+        summary = await asyncio.shield(task)
 
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating response: {str(e)}"
         )
 
-    return {"inventory": inventory, "summary": summary}
+    return {**response, "summary": summary, "summary_status": "fresh"}
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from middleware.admission import limiters
+from ml.intent_classifier import intent_stats
+from ml.runtime import runtime_state
+from redis_client.answer_cache import answer_cache_stats
+from observability.metrics import GaugeCollector, render_metrics
+
+router = APIRouter()
+
+GaugeCollector(
+    "admission_state",
+    "Admission control in-flight requests, queue depth and outcomes per route class",
+    ("route_class", "field"),
+    lambda: [
+        ((name, field), value)
+        for name, limiter in limiters.items()
+        for field, value in limiter.snapshot().items()
+    ],
+)
+GaugeCollector(
+    "intent_classifier_state",
+    "Local intent classifier fast-path and LLM agreement counters",
+    ("field",),
+    lambda: [((field,), value) for field, value in intent_stats.snapshot().items()],
+)
+GaugeCollector(
+    "chat_answer_cache_state",
+    "Chat answer cache hits, misses and stores",
+    ("field",),
+    lambda: [((field,), value) for field, value in answer_cache_stats.snapshot().items()],
+)
+
+
+@router.get("/admission", status_code=status.HTTP_200_OK)
+def admission_stats():
+    return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+
+@router.get("/runtime", status_code=status.HTTP_200_OK)
+def runtime():
+    return runtime_state()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
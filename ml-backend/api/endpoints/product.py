@@ -1,10 +1,10 @@
-import pandas as pd
 from db.product import Product
 from sqlalchemy.orm import Session
 from db.database import SessionLocal
 from schemas.product import  MetricsResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 from collections import defaultdict
+from datetime import datetime
 
 router = APIRouter()
 
@@ -65,7 +65,7 @@ def get_metrics(db: Session = Depends(get_db)):
         all_top_products = {}  # Overall top products across all periods
 
         for period, group_products in grouped.items():
-            period = pd.to_datetime(period, format="%Y-%m").strftime("%b-%Y")
+            period = datetime.strptime(period, "%Y-%m").strftime("%b-%Y")
 
             total_revenue[period] = round(
                 sum(p.Current_Price * p.Units_Sold for p in group_products), 2
@@ -88,9 +88,7 @@ def get_metrics(db: Session = Depends(get_db)):
 
         top_products_dict = dict(top_4)
 
-        latest_period = pd.to_datetime(last_4_periods[0], format="%Y-%m").strftime(
-            "%b-%Y"
-        )
+        latest_period = datetime.strptime(last_4_periods[0], "%Y-%m").strftime("%b-%Y")
 
         response_data = {
             "monthly_revenue": total_revenue,
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.endpoints import product, forecasting, chat, data_connect, inventory
+from api.endpoints import product, forecasting, chat, data_connect, inventory, observability
 
 api_router = APIRouter()
 api_router.include_router(product.router, prefix="/product", tags=["Products"])
@@ -7,4 +7,5 @@ api_router.include_router(forecasting.router, prefix="/forecast", tags=["Forecas
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat Model"])
 api_router.include_router(data_connect.router, prefix="/data_connect", tags=["Data Connect"])
 api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
+api_router.include_router(observability.router, prefix="/observability", tags=["Observability"])
 
@@ -0,0 +1,100 @@
+"""Synthetic catalogs in the `products` schema, of any size.
+
+    python -m benchmarks.catalog --products 500 --periods 36 --output catalog.csv
+
+The CSV can be uploaded through /data_connect/ as is.
+"""
+import csv
+import math
+import random
+import argparse
+
+COLUMNS = [
+    "Product_ID",
+    "Product_Name",
+    "Category",
+    "Period",
+    "Current_Price",
+    "Opening_Price",
+    "Cost_Per_Unit",
+    "Units_Sold",
+    "Opening_Stock",
+    "Stock_Received",
+    "Revenue",
+    "Stock_On_Hand",
+]
+
+CATEGORIES = ["Beverages", "Snacks", "Dairy", "Bakery", "Frozen", "Household", "Personal Care"]
+
+
+def periods(count: int, start_year: int = 2022) -> list:
+    return [f"{start_year + i // 12}-{i % 12 + 1:02d}" for i in range(count)]
+
+
+def generate_catalog(
+    products: int, period_count: int, seed: int = 0, prefix: str = "P"
+) -> list:
+    """Monthly rows for each product with trend, seasonality and noise"""
+    rng = random.Random(seed)
+    months = periods(period_count)
+    rows = []
+
+    for i in range(products):
+        product_id = f"{prefix}{i:05d}"
+        price = round(rng.uniform(2, 80), 2)
+        cost = round(price * rng.uniform(0.4, 0.8), 2)
+        base = rng.uniform(20, 400)
+        trend = rng.uniform(-0.01, 0.03)
+        season = rng.uniform(0, 0.3)
+        stock = int(base * rng.uniform(1, 3))
+
+        for t, period in enumerate(months):
+            month = int(period[-2:])
+            demand = base * (1 + trend) ** t * (1 + season * math.sin(2 * math.pi * month / 12))
+            units_sold = max(int(rng.gauss(demand, demand * 0.1)), 0)
+            received = int(demand * rng.uniform(0.8, 1.3))
+            units_sold = min(units_sold, stock + received)
+            opening_price = price
+            price = round(price * rng.uniform(0.98, 1.03), 2)
+
+            rows.append(
+                {
+                    "Product_ID": product_id,
+                    "Product_Name": f"Product {prefix}{i}",
+                    "Category": CATEGORIES[i % len(CATEGORIES)],
+                    "Period": period,
+                    "Current_Price": price,
+                    "Opening_Price": opening_price,
+                    "Cost_Per_Unit": cost,
+                    "Units_Sold": units_sold,
+                    "Opening_Stock": stock,
+                    "Stock_Received": received,
+                    "Revenue": round(price * units_sold, 2),
+                    "Stock_On_Hand": stock + received - units_sold,
+                }
+            )
+            stock = stock + received - units_sold
+
+    return rows
+
+
+def to_csv(rows: list, file):
+    writer = csv.DictWriter(file, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--periods", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="catalog.csv")
+    args = parser.parse_args()
+
+    with open(args.output, "w", newline="") as file:
+        to_csv(generate_catalog(args.products, args.periods, args.seed), file)
+
+
+if __name__ == "__main__":
+    main()
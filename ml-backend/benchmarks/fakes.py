@@ -0,0 +1,251 @@
+"""Offline stand-ins for the model, the LLMs, Redis and Postgres.
+
+Latencies are configurable so a benchmark can model a slow or fast provider
+while still exercising the endpoint code around it.
+"""
+import os
+import sys
+import time
+import tempfile
+import asyncio
+import random
+from types import SimpleNamespace
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from db.database import Base, SessionLocal
+from db.product import Product
+from settings.settings import api_settings
+from ml.demand_forecasting import ChronosForecaster, TARGET_COLUMNS
+from ml.intent_classifier import classify_locally
+
+APP_PACKAGES = {"main", "api", "middleware", "ml", "redis_client"}
+
+# What the fake SQL agent runs for every analytical question.
+SQL_QUERY = 'SELECT "Category", SUM("Revenue") FROM products GROUP BY "Category"'
+
+
+class FakeLLM:
+    """Answers like a chat model client after a fixed delay plus jitter"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, reply: str = "ok"):
+        self.latency = latency
+        self.jitter = jitter
+        self.reply = reply
+
+    def _delay(self) -> float:
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0)
+
+    def _message(self):
+        return SimpleNamespace(content=[{"type": "text", "text": self.reply}])
+
+    def invoke(self, *args, **kwargs):
+        time.sleep(self._delay())
+        return self._message()
+
+    async def ainvoke(self, *args, **kwargs):
+        await asyncio.sleep(self._delay())
+        return self._message()
+
+
+class FakeForecaster(ChronosForecaster):
+    """Mean of the last three periods per series, shaped like Chronos output.
+
+    Only the model call is replaced, so preprocessing and the baseline route
+    still run. It blocks for `latency + latency_per_series * series`, like
+    the real model does inside the request.
+    """
+
+    def __init__(self, latency: float = 0.05, latency_per_series: float = 0.0005):
+        self.latency = latency
+        self.latency_per_series = latency_per_series
+
+    def _predict_model(self, df, target: str, prediction_length: int):
+        df = pd.DataFrame(df)[TARGET_COLUMNS[target]]
+        df["period"] = pd.to_datetime(df["period"])
+        levels = df.sort_values("period").groupby("product_id")[target].apply(
+            lambda values: values.tail(3).mean()
+        )
+
+        time.sleep(self.latency + self.latency_per_series * len(levels))
+
+        last = df["period"].max()
+        return pd.DataFrame(
+            [
+                {
+                    "product_id": product_id,
+                    "period": last + pd.DateOffset(months=step),
+                    "target_name": target,
+                    "predictions": level,
+                    "0.1": level * 0.8,
+                    "0.5": level,
+                    "0.9": level * 1.2,
+                }
+                for product_id, level in levels.items()
+                for step in range(1, prediction_length + 1)
+            ]
+        )
+
+
+class FakeChatLLM(GenericFakeChatModel):
+    """LangChain chat model for the real ChatModel graph, after a fixed delay plus jitter.
+
+    Replies come from `messages` as in GenericFakeChatModel. Once tools are
+    bound (the SQL agent) it first asks for one sql_db_query call, then
+    answers from the tool result, so an analytical question costs the same
+    two LLM round trips and one query as with the real model.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.1
+    tools_bound: bool = False
+
+    def _delay(self) -> float:
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0)
+
+    def _reply(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.tools_bound and not isinstance(messages[-1], ToolMessage):
+            call = {
+                "name": "sql_db_query",
+                "args": {"query": SQL_QUERY},
+                "id": f"call_{random.getrandbits(32):08x}",
+                "type": "tool_call",
+            }
+            message = AIMessage(content="", tool_calls=[call])
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._delay())
+        return self._reply(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._reply(messages, stop, None, **kwargs)
+
+    def bind_tools(self, tools, **kwargs):
+        # GenericFakeChatModel streams text only, so tool calls must not go
+        # through the streaming path.
+        return self.model_copy(update={"tools_bound": True, "disable_streaming": True})
+
+    def with_structured_output(self, schema, **kwargs):
+        """Intent classifier: the local rules' guess, or analytical"""
+
+        def intent(messages):
+            local = classify_locally(messages[-1]["content"])
+            return schema(message_type=local.message_type or "analytical")
+
+        def classify(messages):
+            time.sleep(self._delay())
+            return intent(messages)
+
+        async def aclassify(messages):
+            await asyncio.sleep(self._delay())
+            return intent(messages)
+
+        return RunnableLambda(classify, afunc=aclassify)
+
+
+@compiles(UUID, "sqlite")
+def _uuid_for_sqlite(type_, compiler, **kwargs):
+    # SQLite gives an unknown UUID column NUMERIC affinity, so anything that
+    # reflects the table (the SQL agent's SQLDatabase) reads the hex ids
+    # back as decimals and fails. Store them as the text they are.
+    return "CHAR(32)"
+
+
+def use_sqlite(rows: list = ()):
+    """Point every session at a fresh SQLite database holding rows"""
+    # A file rather than :memory: so that concurrent requests get their own
+    # connections, as they would from the Postgres pool.
+    path = os.path.join(tempfile.mkdtemp(prefix="sarah-bench-"), "products.db")
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal.configure(bind=engine)
+    # The SQL agent opens its own connection from the settings.
+    api_settings.DATABASE_URL = str(engine.url)
+
+    if rows:
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(Product, list(rows))
+            db.commit()
+        finally:
+            db.close()
+
+    return engine
+
+
+def use_fake_redis():
+    """Swap the pooled Redis clients for fakeredis, wherever they were imported"""
+    import fakeredis
+    import fakeredis.aioredis
+    import redis_client.connection as connection
+
+    server = fakeredis.FakeServer()
+    fakes = {
+        "get_redis": lambda: fakeredis.FakeRedis(server=server, decode_responses=True),
+        "get_binary_redis": lambda: fakeredis.FakeRedis(server=server),
+        "get_async_redis": lambda: fakeredis.aioredis.FakeRedis(
+            server=server, decode_responses=True
+        ),
+        "get_async_binary_redis": lambda: fakeredis.aioredis.FakeRedis(server=server),
+    }
+    originals = {name: getattr(connection, name) for name in fakes}
+
+    for module_name, module in list(sys.modules.items()):
+        if module_name.split(".")[0] not in APP_PACKAGES:
+            continue
+        for name, fake in fakes.items():
+            if getattr(module, name, None) is originals[name]:
+                setattr(module, name, fake)
+
+    # The SQL result cache holds a client created at import time.
+    sql_tools = sys.modules.get("ml.sql_tools")
+    if sql_tools is not None:
+        sql_tools._redis = fakes["get_redis"]()
+
+    return server
+
+
+def use_fake_forecaster(forecaster: FakeForecaster):
+    """Serve get_forecaster() from the fake instead of loading Chronos"""
+    import ml.runtime as runtime
+
+    runtime._build_forecaster = lambda: forecaster
+
+
+def use_fake_insight_llm(llm: FakeLLM):
+    """Make InventoryModel send inventory summaries to the fake LLM"""
+    import ml.inventory_model as inventory_model
+
+    def __init__(self):
+        self.model_name = inventory_model.INSIGHT_MODEL
+        self.llm_1 = llm
+
+    inventory_model.InventoryModel.__init__ = __init__
+
+
+def use_fake_chat_llms(llm: FakeChatLLM):
+    """Build the real ChatModel graph on the fake LLM and fake embeddings.
+
+    Call before use_fake_redis, which only patches modules already imported.
+    """
+    import ml.chat_model as chat_model
+    import ml.runtime as runtime
+
+    chat_model.ChatGoogleGenerativeAI = lambda **kwargs: llm
+    chat_model.GoogleGenerativeAIEmbeddings = lambda **kwargs: DeterministicFakeEmbedding(
+        size=768
+    )
+    runtime._build_chat_model.cache_clear()
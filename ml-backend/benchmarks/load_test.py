@@ -0,0 +1,268 @@
+"""Throughput and p50/p99 latency of the hot endpoints, fully offline.
+
+The app runs in-process behind httpx's ASGI transport with SQLite, fakeredis,
+a fake forecaster and fake LLMs (see benchmarks/fakes.py), so results depend
+on our code and the configured fake latencies only:
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test --products 200 --periods 36 --concurrency 16
+    python -m benchmarks.load_test --output after.json --compare before.json
+
+--output writes a JSON report; --compare prints the change against an
+earlier report, e.g. one from the previous commit. Repeated GETs are served
+from the HTTP response cache after the first; --no-http-cache varies them
+so every request runs the endpoint.
+
+The chat scenario runs the real ChatModel graph, with FakeChatLLM in place
+of the Gemini clients.
+"""
+import os
+
+# Settings without defaults; nothing connects to these offline.
+for name, value in {
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "DATABASE_URL": "sqlite://",
+    "GEMINI_API_KEY": "offline",
+    "GROQ_API_KEY": "offline",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+}.items():
+    os.environ.setdefault(name, value)
+
+import io
+import json
+import math
+import time
+import asyncio
+import argparse
+import itertools
+import subprocess
+from collections import Counter
+from datetime import datetime, timezone
+import httpx
+from main import app
+from benchmarks.catalog import generate_catalog, to_csv
+from benchmarks.fakes import (
+    FakeLLM,
+    FakeChatLLM,
+    FakeForecaster,
+    use_sqlite,
+    use_fake_redis,
+    use_fake_forecaster,
+    use_fake_chat_llms,
+    use_fake_insight_llm,
+)
+
+CHAT_MESSAGES = [
+    "Hi there",
+    "What was our total revenue last month?",
+    "Which category sold the most units this year?",
+    "Forecast units sold for the next 3 months",
+    "and what about revenue?",
+]
+
+
+def build_scenarios(args) -> dict:
+    product_ids = [f"P{i:05d}" for i in range(args.products)]
+    request_ids = itertools.count()
+
+    def get(path, params: dict):
+        # A unique query string gives every request its own ETag, so it
+        # misses the HTTP response cache and runs the endpoint.
+        if args.no_http_cache:
+            params = {**params, "bench_request": next(request_ids)}
+        return "GET", path, {"params": params}
+
+    def forecast(path):
+        def request(i):
+            # Alternate between the all-products total and single products.
+            params = {"product_id": product_ids[i % len(product_ids)]} if i % 2 else {}
+            return get(path, params)
+
+        return request
+
+    def inventory_items(i):
+        params = {"limit": 50, "sort": ("product_id", "stock_on_hand", "revenue")[i % 3]}
+        if i % 2:
+            params["stockout_within"] = 3
+        return get("/inventory/items", params)
+
+    def chat(i):
+        return "POST", "/chat/", {
+            "json": {
+                "message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)],
+                "session_id": f"bench-{i % args.sessions}",
+            }
+        }
+
+    def data_connect(i):
+        rows = generate_catalog(
+            args.upload_products, args.periods, seed=i, prefix=f"U{i}-"
+        )
+        file = io.StringIO()
+        to_csv(rows, file)
+        return "POST", "/data_connect/", {
+            "files": {"file": ("catalog.csv", file.getvalue(), "text/csv")}
+        }
+
+    # data_connect runs last: it grows the catalog and bumps the data version.
+    return {
+        "product_metrics": lambda i: get("/product/metrics", {}),
+        "forecast_units": forecast("/forecast/units"),
+        "forecast_revenue": forecast("/forecast/revenue"),
+        "inventory_items": inventory_items,
+        "inventory_insight": lambda i: ("GET", "/inventory/insight", {}),
+        "chat": chat,
+        "data_connect": data_connect,
+    }
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+async def run_scenario(client, request, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    counter = itertools.count()
+
+    async def worker():
+        while (i := next(counter)) < requests:
+            method, url, kwargs = request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": requests / wall,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "statuses": dict(statuses),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"commit {report['commit'] or '?'}  catalog {report['config']['products']}x{report['config']['periods']}")
+    print(f"{'scenario':<20}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+
+    for name, result in report["scenarios"].items():
+        line = (
+            f"{name:<20}{result['throughput_rps']:>10.1f}"
+            f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}  {result['statuses']}"
+        )
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous:
+            changes = [
+                f"{field} {(result[field] / previous[field] - 1) * 100:+.0f}%"
+                for field in ("throughput_rps", "p50_ms", "p99_ms")
+                if previous[field]
+            ]
+            line += f"  vs {baseline['commit'] or 'baseline'}: {', '.join(changes)}"
+        print(line)
+
+
+async def run(args) -> dict:
+    llm = FakeLLM(args.llm_latency, args.llm_jitter)
+    chat_llm = FakeChatLLM(
+        messages=itertools.repeat("ok"), latency=args.llm_latency, jitter=args.llm_jitter
+    )
+    forecaster = FakeForecaster(args.model_latency, args.model_latency_per_series)
+
+    use_sqlite(generate_catalog(args.products, args.periods, args.seed))
+    use_fake_chat_llms(chat_llm)
+    use_fake_redis()
+    use_fake_forecaster(forecaster)
+    use_fake_insight_llm(llm)
+
+    scenarios = build_scenarios(args)
+    selected = args.scenario or list(scenarios)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in selected:
+            results[name] = await run_scenario(
+                client, scenarios[name], args.requests, args.concurrency
+            )
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": vars(args),
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--periods", type=int, default=36)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--upload-products", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--model-latency-per-series", type=float, default=0.0005)
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="vary every cacheable GET so it runs the endpoint instead of hitting the HTTP cache",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[
+            "product_metrics",
+            "forecast_units",
+            "forecast_revenue",
+            "inventory_items",
+            "inventory_insight",
+            "chat",
+            "data_connect",
+        ],
+    )
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
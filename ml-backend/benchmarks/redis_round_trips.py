@@ -0,0 +1,76 @@
+"""Round trips and latency per chat turn for chat history writes.
+
+Run from ml-backend against the Redis configured in settings:
+
+    python -m benchmarks.redis_round_trips --turns 200
+"""
+import time
+import uuid
+import argparse
+import redis
+from redis.connection import Connection
+from settings.settings import api_settings
+from redis_client.memory_manager import ChatMemoryManager
+
+round_trips = 0
+_send_packed_command = Connection.send_packed_command
+
+
+def _counting_send(self, command, check_health=True):
+    global round_trips
+    round_trips += 1
+    return _send_packed_command(self, command, check_health)
+
+
+Connection.send_packed_command = _counting_send
+
+
+def turn_before(session_id: str):
+    # A new client per request and one RPUSH + EXPIRE per message, as the
+    # endpoint used to do.
+    client = redis.Redis(
+        host=api_settings.REDIS_HOST, port=api_settings.REDIS_PORT, decode_responses=True
+    )
+    key = f"chat:session:{session_id}"
+    for role, content in (("user", "question"), ("ai", "answer")):
+        client.rpush(key, f'{{"role": "{role}", "content": "{content}", "metadata": {{}}}}')
+        client.expire(key, 60 * 60 * 24)
+    client.close()
+
+
+def turn_after(session_id: str):
+    ChatMemoryManager().add_messages(
+        session_id,
+        [{"role": "user", "content": "question"}, {"role": "ai", "content": "answer"}],
+    )
+
+
+def run(name: str, turn, turns: int):
+    global round_trips
+    session_id = f"bench-{uuid.uuid4()}"
+    round_trips = 0
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        turn(session_id)
+    elapsed = time.perf_counter() - start
+
+    ChatMemoryManager().clear_session(session_id)
+
+    print(
+        f"{name:<8} {round_trips / turns:>14.1f} {elapsed / turns * 1000:>14.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'':<8} {'trips / turn':>14} {'ms / turn':>14}")
+    run("before", turn_before, args.turns)
+    run("after", turn_after, args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Serialization time per 10k rows for inventory and forecast payloads.
+
+Compares FastAPI's old path for these endpoints (jsonable_encoder + json.dumps
+on ORM objects / plain dicts) with typed response models rendered by orjson,
+and with the columnar inventory layout:
+
+    python -m benchmarks.serialization --rows 10000
+"""
+import json
+import time
+import uuid
+import orjson
+import argparse
+from typing import List
+from pydantic import TypeAdapter
+from fastapi.encoders import jsonable_encoder
+from db.product import Product
+from schemas.product import InventoryItemResponse
+from schemas.forecast import UnitsPredictionItem
+from api.endpoints.inventory import INVENTORY_COLUMNS
+
+
+def make_products(rows: int) -> list:
+    return [
+        Product(
+            id=uuid.uuid4(),
+            Product_ID=f"P{i:05d}",
+            Product_Name=f"Product {i}",
+            Category=f"Category {i % 12}",
+            Period="2025-06",
+            Current_Price=19.99 + i % 50,
+            Opening_Price=18.49 + i % 50,
+            Cost_Per_Unit=11.25 + i % 30,
+            Units_Sold=100 + i % 400,
+            Opening_Stock=500 + i % 300,
+            Stock_Received=200 + i % 100,
+            Revenue=(19.99 + i % 50) * (100 + i % 400),
+            Stock_On_Hand=600 + i % 200,
+        )
+        for i in range(rows)
+    ]
+
+
+def make_predictions(rows: int) -> list:
+    return [
+        {
+            "product_id": f"P{i:05d}",
+            "period": "Jul 2025",
+            "target_name": "units_sold",
+            "predictions": 120.0 + i % 40,
+            "units_0_1": 90.0 + i % 40,
+            "units_0_5": 120.0 + i % 40,
+            "units_0_9": 150.0 + i % 40,
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products = make_products(args.rows)
+    predictions = make_predictions(args.rows)
+    inventory_adapter = TypeAdapter(List[InventoryItemResponse])
+    prediction_adapter = TypeAdapter(List[UnitsPredictionItem])
+
+    def typed(adapter, rows):
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return orjson.dumps(adapter.dump_python(validated, mode="json", by_alias=True))
+
+    cases = [
+        ("inventory: jsonable_encoder", lambda: json.dumps(jsonable_encoder(products))),
+        ("inventory: typed + orjson", lambda: typed(inventory_adapter, products)),
+        (
+            "inventory: columnar orjson",
+            lambda: orjson.dumps(
+                {c: [getattr(p, c) for p in products] for c in INVENTORY_COLUMNS}
+            ),
+        ),
+        ("forecast: jsonable_encoder", lambda: json.dumps(jsonable_encoder(predictions))),
+        ("forecast: typed + orjson", lambda: typed(prediction_adapter, predictions)),
+    ]
+
+    print(f"{'case':<30} {'ms / ' + str(args.rows) + ' rows':>18}")
+    for name, fn in cases:
+        print(f"{name:<30} {timed(fn, args.repeat):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
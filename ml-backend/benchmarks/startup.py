@@ -0,0 +1,123 @@
+"""Cold start time of the API: importing `main` and time until a worker is ready.
+
+Each run starts a fresh interpreter, so nothing is shared between runs:
+
+    python -m benchmarks.startup --runs 5
+
+"import" is the time to import `main`; "ready" is the time from spawning
+uvicorn until `GET /` answers; "warm" is the time until the background
+warm-up has loaded the forecaster and chat runtime (see /observability/runtime).
+Pass --no-server to only measure imports, e.g. without Postgres or Redis.
+"""
+import sys
+import time
+import json
+import socket
+import argparse
+import statistics
+import subprocess
+import httpx
+
+HEAVY_MODULES = ["torch", "chronos", "langchain", "langgraph", "pandas"]
+
+IMPORT_SCRIPT = f"""
+import sys, time, json
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, done, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            response = httpx.get(url, timeout=1)
+            if done(response):
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def measure_server(warm: bool, timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        result = {
+            "ready": wait_for(f"{base}/", lambda r: r.status_code == 200, timeout) - start
+        }
+        if warm:
+            result["warm"] = (
+                wait_for(
+                    f"{base}/observability/runtime",
+                    lambda r: r.json()["finished_at"] is not None,
+                    timeout,
+                )
+                - start
+            )
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(name: str, samples: list):
+    if samples:
+        print(
+            f"{name:<8} median {statistics.median(samples) * 1000:8.0f} ms"
+            f"   min {min(samples) * 1000:8.0f} ms   max {max(samples) * 1000:8.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--no-server", action="store_true")
+    parser.add_argument("--no-warm", action="store_true")
+    args = parser.parse_args()
+
+    imports, ready, warm = [], [], []
+    heavy = set()
+    for _ in range(args.runs):
+        result = measure_import()
+        imports.append(result["seconds"])
+        heavy.update(result["heavy"])
+
+        if not args.no_server:
+            result = measure_server(not args.no_warm, args.timeout)
+            ready.append(result["ready"])
+            if "warm" in result:
+                warm.append(result["warm"])
+
+    report("import", imports)
+    report("ready", ready)
+    report("warm", warm)
+    print(f"heavy modules imported by main: {', '.join(sorted(heavy)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
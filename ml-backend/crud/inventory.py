@@ -1,7 +1,24 @@
+import json
+import base64
+from typing import Optional
 from db.product import Product
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.orm import Session
 
+# Sort options for the paginated listing; each is backed by a
+# (Period, <column>, Product_ID) index.
+SORT_COLUMNS = {
+    "product_id": Product.Product_ID,
+    "stock_on_hand": Product.Stock_On_Hand,
+    "revenue": Product.Revenue,
+}
+
+# Trailing periods averaged to estimate monthly demand for the stockout filter.
+# This is sales velocity, deliberately not the forecast: the insight endpoint's
+# predicted_stockout_month comes from the model and can differ.
+DEMAND_PERIODS = 3
+
+
 def get_latest_products(session: Session):
     latest_period = session.scalar(select(func.max(Product.Period)))
     if not latest_period:
@@ -9,4 +26,95 @@ def get_latest_products(session: Session):
 
     return session.scalars(
         select(Product).where(Product.Period == latest_period)
-    ).all()
\ No newline at end of file
+    ).all()
+
+
+def encode_cursor(sort: str, descending: bool, sort_value, product_id: str) -> str:
+    payload = json.dumps([sort, descending, sort_value, product_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> tuple:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors or
+    cursors issued for a different sort or order"""
+    try:
+        cursor_sort, cursor_descending, sort_value, product_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+    if (cursor_sort, cursor_descending) != (sort, descending):
+        raise ValueError("Cursor does not match the requested sort and order")
+
+    return sort_value, product_id
+
+
+def get_inventory_page(
+    session: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: str = "product_id",
+    descending: bool = False,
+    category: Optional[str] = None,
+    max_stock: Optional[int] = None,
+    stockout_within: Optional[int] = None,
+) -> tuple[list, Optional[str]]:
+    """One page of the latest period's products, ordered by (sort, Product_ID)"""
+    latest_period = session.scalar(select(func.max(Product.Period)))
+    if not latest_period:
+        return [], None
+
+    column = SORT_COLUMNS[sort]
+    key = tuple_(column, Product.Product_ID)
+    query = select(Product).where(Product.Period == latest_period)
+
+    if category is not None:
+        query = query.where(Product.Category == category)
+
+    if max_stock is not None:
+        query = query.where(Product.Stock_On_Hand <= max_stock)
+
+    if stockout_within is not None:
+        # Stock covers fewer months than the window at the trailing average
+        # sales rate.
+        recent_periods = (
+            select(Product.Period)
+            .distinct()
+            .order_by(Product.Period.desc())
+            .limit(DEMAND_PERIODS)
+            .scalar_subquery()
+        )
+        demand = (
+            select(
+                Product.Product_ID.label("product_id"),
+                func.avg(Product.Units_Sold).label("monthly_units"),
+            )
+            .where(Product.Period.in_(recent_periods))
+            .group_by(Product.Product_ID)
+            .subquery()
+        )
+        query = query.join(demand, demand.c.product_id == Product.Product_ID).where(
+            Product.Stock_On_Hand < demand.c.monthly_units * stockout_within
+        )
+
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor, sort, descending))
+        query = query.where(key < after if descending else key > after)
+
+    if descending:
+        query = query.order_by(column.desc(), Product.Product_ID.desc())
+    else:
+        query = query.order_by(column.asc(), Product.Product_ID.asc())
+
+    rows = session.scalars(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort, descending, getattr(last, column.key), last.Product_ID
+        )
+
+    return rows, next_cursor
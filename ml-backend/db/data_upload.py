@@ -0,0 +1,22 @@
+from db.database import Base
+from sqlalchemy import Column, Integer, String, Float, select
+
+
+class DataUpload(Base):
+    """One row per committed upload; the latest id is the durable data version"""
+
+    __tablename__ = "data_uploads"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    Filename = Column(String, nullable=False)
+    Rows = Column(Integer, nullable=False)
+    Uploaded_At = Column(Float, nullable=False)  # Unix time
+
+
+def latest_upload(session) -> tuple[int, float | None]:
+    """Version and time of the latest upload, (0, None) before the first"""
+    row = session.execute(
+        select(DataUpload.id, DataUpload.Uploaded_At).order_by(DataUpload.id.desc()).limit(1)
+    ).first()
+
+    return (row.id, row.Uploaded_At) if row else (0, None)
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from settings.settings import api_settings
+from observability.sql import instrument_engine
 
 DATABASE_URL = (
     f"postgresql+psycopg2://{api_settings.POSTGRES_USER}:"
@@ -15,6 +16,8 @@ engine = create_engine(
     echo=False,
 )
 
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 Base = declarative_base()
\ No newline at end of file
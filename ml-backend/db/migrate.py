@@ -0,0 +1,22 @@
+"""Create the database schema.
+
+Run once per deploy, before starting the API workers:
+
+    python -m db.migrate
+"""
+from db.database import engine, Base
+from db.product import Product
+from db.data_upload import DataUpload  # noqa: F401  (registers the table)
+
+
+def migrate():
+    Base.metadata.create_all(bind=engine)
+
+    # create_all skips tables that already exist, so add indexes introduced
+    # since the table was created.
+    for index in Product.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -23,4 +23,9 @@ class Product(Base):
     __table_args__ = (
         UniqueConstraint('Product_ID', 'Period', name='uix_product_period'),
         Index('ix_product_period', 'Product_ID', 'Period'),
+        # Keyset pagination of the latest period (crud.inventory.get_inventory_page).
+        Index('ix_period_product', 'Period', 'Product_ID'),
+        Index('ix_period_category_product', 'Period', 'Category', 'Product_ID'),
+        Index('ix_period_stock_product', 'Period', 'Stock_On_Hand', 'Product_ID'),
+        Index('ix_period_revenue_product', 'Period', 'Revenue', 'Product_ID'),
     )
\ No newline at end of file
@@ -1,17 +1,55 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from db.database import engine, Base
+from fastapi.responses import ORJSONResponse
 from api.router import api_router
+from ml.runtime import warm_up
+from settings.settings import api_settings
+from middleware.admission import AdmissionControlMiddleware
+from middleware.conditional import ConditionalGetMiddleware
+from middleware.timing import TimingMiddleware
+from redis_client.data_version import DataVersion
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger("sarah.startup")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the forecaster and chat runtime in the background, so the worker
+    # accepts traffic right away. Requests that need them before the warm-up
+    # finishes wait for the same build. The schema is created by
+    # `python -m db.migrate`, not here.
+    app.state.warm_up = None
+    if api_settings.WARM_UP_ON_STARTUP:
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    # Catch up on an upload whose version update never reached Redis.
+    try:
+        await DataVersion().sync()
+    except Exception:
+        logger.warning("Could not sync the data version", exc_info=True)
+
+    yield
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
 
+# Added before CORS so that load-shedding responses still carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware)
+
+# Outside admission control so revalidated and cached reads never queue.
+app.add_middleware(ConditionalGetMiddleware)
+
+# Outermost, so latency includes queueing and cache lookups.
+app.add_middleware(TimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -0,0 +1,180 @@
+import json
+import heapq
+import asyncio
+import itertools
+from dataclasses import dataclass
+from typing import Optional
+from settings.settings import api_settings
+from middleware.timing import ROUTE_LABEL
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+@dataclass
+class RouteClass:
+    name: str
+    method: str
+    prefix: str
+    max_concurrency: int
+    max_queue: int
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded, priority-ordered wait queue"""
+
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: str = "normal"):
+        if self.in_flight < self.route_class.max_concurrency and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.route_class.max_queue:
+            self.rejected += 1
+            raise Rejected(429, f"Too many {self.route_class.name} requests queued")
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (PRIORITIES.get(priority, PRIORITIES["normal"]), next(self._order), waiter),
+        )
+        self.queued += 1
+
+        try:
+            await asyncio.wait_for(waiter, api_settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+                self.queued -= 1
+
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+            self.timed_out += 1
+            raise Rejected(503, f"Timed out waiting for a {self.route_class.name} slot")
+
+        self.admitted += 1
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or free it"""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled():
+                continue
+
+            self.queued -= 1
+            waiter.set_result(None)
+            return
+
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_concurrency": self.route_class.max_concurrency,
+            "max_queue": self.route_class.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+ROUTE_CLASSES = [
+    RouteClass(
+        "chat",
+        "POST",
+        "/chat",
+        api_settings.ADMISSION_CHAT_CONCURRENCY,
+        api_settings.ADMISSION_CHAT_QUEUE,
+    ),
+    RouteClass(
+        "insight",
+        "GET",
+        "/inventory/insight",
+        api_settings.ADMISSION_INSIGHT_CONCURRENCY,
+        api_settings.ADMISSION_INSIGHT_QUEUE,
+    ),
+    RouteClass(
+        "forecast",
+        "GET",
+        "/forecast/",
+        api_settings.ADMISSION_FORECAST_CONCURRENCY,
+        api_settings.ADMISSION_FORECAST_QUEUE,
+    ),
+]
+
+limiters = {route_class.name: AdmissionLimiter(route_class) for route_class in ROUTE_CLASSES}
+
+
+def _match(scope) -> Optional[AdmissionLimiter]:
+    for route_class in ROUTE_CLASSES:
+        if scope["method"] == route_class.method and scope["path"].startswith(
+            route_class.prefix
+        ):
+            return limiters[route_class.name]
+
+    return None
+
+
+class AdmissionControlMiddleware:
+    """Limit concurrent expensive requests per route class and shed excess load"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limiter = _match(scope) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        priority = headers.get(b"x-priority", b"normal").decode("latin-1").lower()
+
+        try:
+            await limiter.acquire(priority)
+        except Rejected as e:
+            # Rejected before routing; label by the route class prefix.
+            scope[ROUTE_LABEL] = limiter.route_class.prefix
+            await self._reject(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, rejection: Rejected):
+        body = json.dumps({"detail": rejection.detail}).encode("utf-8")
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": rejection.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(api_settings.ADMISSION_RETRY_AFTER_SECONDS).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,121 @@
+import hashlib
+from email.utils import formatdate
+from urllib.parse import parse_qsl, urlencode
+from redis.exceptions import RedisError
+from settings.settings import api_settings
+from redis_client.connection import get_async_binary_redis
+from redis_client.data_version import DataVersion
+from observability.metrics import span
+from middleware.timing import ROUTE_LABEL
+
+# Read endpoints whose payload only changes when new data is uploaded.
+CACHEABLE_PATHS = {
+    "/product/metrics",
+    "/inventory/",
+    "/inventory/items",
+    "/forecast/units",
+    "/forecast/revenue",
+}
+
+
+def _etag(scope, version: int) -> str:
+    query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"))))
+    digest = hashlib.sha256(f"{scope['path']}?{query}".encode("utf-8")).hexdigest()
+
+    return f'"v{version}-{digest[:16]}"'
+
+
+class ConditionalGetMiddleware:
+    """ETag/Last-Modified from the data version, 304s and a shared response cache"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in CACHEABLE_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            with span("redis_data_version"):
+                version, updated_at = await DataVersion().get_state()
+        except RedisError:
+            await self.app(scope, receive, send)
+            return
+
+        etag = _etag(scope, version)
+        validators = [(b"etag", etag.encode("latin-1")), (b"cache-control", b"no-cache")]
+        if updated_at is not None:
+            validators.append(
+                (b"last-modified", formatdate(updated_at, usegmt=True).encode("latin-1"))
+            )
+
+        headers = dict(scope["headers"])
+        if_none_match = [
+            tag.strip().removeprefix(b"W/")
+            for tag in headers.get(b"if-none-match", b"").split(b",")
+        ]
+        if etag.encode("latin-1") in if_none_match or b"*" in if_none_match:
+            scope[ROUTE_LABEL] = scope["path"]
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        redis = get_async_binary_redis()
+        cache_key = f"http:cache:{etag}"
+
+        try:
+            with span("redis_http_cache"):
+                cached = await redis.hgetall(cache_key)
+        except RedisError:
+            cached = None
+
+        if cached:
+            scope[ROUTE_LABEL] = scope["path"]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", cached[b"type"]),
+                        (b"content-length", str(len(cached[b"body"])).encode("latin-1")),
+                        *validators,
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": cached[b"body"]})
+            return
+
+        start = {}
+        body = []
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                if message["status"] == 200:
+                    message["headers"] = [*message.get("headers", []), *validators]
+
+            elif message["type"] == "http.response.body" and start.get("status") == 200:
+                body.append(message.get("body", b""))
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+        if start.get("status") != 200:
+            return
+
+        content_type = dict(start.get("headers", [])).get(b"content-type", b"application/json")
+
+        try:
+            with span("redis_http_cache"):
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(cache_key, mapping={"type": content_type, "body": b"".join(body)})
+                    pipe.expire(cache_key, api_settings.HTTP_CACHE_TTL_SECONDS)
+                    await pipe.execute()
+        except RedisError:
+            pass
@@ -0,0 +1,62 @@
+import json
+import time
+import logging
+from settings.settings import api_settings
+from observability.metrics import request_latency, request_spans
+
+logger = logging.getLogger("sarah.requests")
+
+# Scope key for the metrics label of responses sent before routing.
+ROUTE_LABEL = "sarah.route_label"
+
+
+class TimingMiddleware:
+    """Request latency histogram per route, plus optional per-request JSON logs"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        spans = []
+        token = request_spans.set(spans)
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_spans.reset(token)
+
+            # Label by route template, not raw path, to keep cardinality bounded.
+            # Middleware that answers before routing sets its own bounded
+            # ROUTE_LABEL instead.
+            route = getattr(scope.get("route"), "path", None)
+            route = route or scope.get(ROUTE_LABEL, "unmatched")
+
+            request_latency.observe(
+                elapsed, method=scope["method"], route=route, status=status["code"]
+            )
+
+            if api_settings.REQUEST_LOG_JSON:
+                logger.info(
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "route": route,
+                            "status": status["code"],
+                            "ms": round(elapsed * 1000, 2),
+                            "spans": spans,
+                        }
+                    )
+                )
@@ -0,0 +1,82 @@
+import re
+from typing import Optional
+from settings.settings import api_settings
+from ml.inventory_prompt import estimate_tokens
+from redis_client.memory_manager import AsyncChatMemoryManager
+from observability.metrics import span
+
+# Openers and references that tie a message to earlier turns of the session.
+FOLLOW_UP = re.compile(
+    r"^\s*(and|also|but|so|then|why|ok|okay|what about|how about|same)\b"
+    r"|\b(it|its|they|them|these|those|the same|above|previous(ly)?|earlier|again"
+    r"|(that|this) (one|with|to|again)"
+    r"|you (said|mentioned|suggested)|I (say|said|ask|asked|tell|told|mention|mentioned)"
+    r"|we (discussed|talked about)|(this|our|the) (conversation|chat)|summari[sz]e|recap)\b"
+    r"|\bbefore\W*$",
+    re.IGNORECASE,
+)
+
+
+def is_follow_up(message: str) -> bool:
+    """Messages that only make sense together with the previous turns"""
+    return FOLLOW_UP.search(message) is not None or len(message.split()) <= 3
+
+
+def assemble_context(summary: Optional[str], messages: list, token_budget: int = None) -> list:
+    """Newest turns that fit in the token budget, preceded by the rolling summary"""
+    if token_budget is None:
+        token_budget = api_settings.CHAT_CONTEXT_TOKEN_BUDGET
+
+    context = []
+    used = 0
+
+    if summary:
+        summary_message = {
+            "role": "user",
+            "content": f"Summary of our conversation so far:\n{summary}",
+        }
+        if estimate_tokens(summary_message["content"]) <= token_budget:
+            context.append(summary_message)
+            used += estimate_tokens(summary_message["content"])
+
+    recent = []
+    for msg in reversed(messages):
+        cost = estimate_tokens(msg["content"])
+        if used + cost > token_budget:
+            break
+
+        role = "assistant" if msg["role"] == "ai" else "user"
+        recent.append({"role": role, "content": msg["content"]})
+        used += cost
+
+    return context + recent[::-1]
+
+
+async def load_context(memory: AsyncChatMemoryManager, session_id: str) -> list:
+    with span("redis_history_read"):
+        summary, messages = await memory.get_context(
+            session_id, api_settings.CHAT_HISTORY_MAX_MESSAGES
+        )
+
+    return assemble_context(summary, messages)
+
+
+async def compact_history(memory: AsyncChatMemoryManager, session_id: str, summarize):
+    """Fold the oldest messages into the rolling summary once a session grows too long"""
+    length = await memory.get_length(session_id)
+    if length <= api_settings.CHAT_HISTORY_MAX_MESSAGES:
+        return
+
+    if not await memory.acquire_compaction(session_id):
+        return
+
+    try:
+        count = length - api_settings.CHAT_HISTORY_KEEP_MESSAGES
+        summary = await memory.get_summary(session_id)
+        oldest = await memory.get_oldest(session_id, count)
+
+        summary = await summarize(summary, oldest)
+        await memory.compact(session_id, summary, count)
+
+    finally:
+        await memory.release_compaction(session_id)
@@ -1,5 +1,6 @@
+import asyncio
 from settings.settings import api_settings
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from typing import Literal, Annotated
 from pydantic import BaseModel, Field
 from langgraph.graph.message import add_messages
@@ -9,6 +10,38 @@ from langgraph.graph import StateGraph, START, END
 from langchain.agents import create_agent
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import SQLDatabaseToolkit
+from langchain_core.messages import AIMessage, AIMessageChunk
+from redis.exceptions import RedisError
+from redis_client.data_version import DataVersion
+from redis_client.answer_cache import ChatAnswerCache
+from ml.sql_tools import cached_sql_tools
+from ml.messages import message_text
+from ml.chat_context import is_follow_up
+from observability.metrics import span
+from ml.runtime import get_forecaster
+from ml.forecasting_agent import (
+    forecast_prompt,
+    latest_period,
+    load_products,
+    load_series,
+    parse_forecast_query,
+)
+from ml.intent_classifier import (
+    LocalIntent,
+    classify_locally,
+    intent_stats,
+    is_confident,
+    should_shadow_check,
+)
+
+ANSWER_NODES = ("normal", "forecasting", "analytical")
+
+TOOL_STEPS = {
+    "sql_db_list_tables": "Listing tables",
+    "sql_db_schema": "Reading table schema",
+    "sql_db_query_checker": "Checking SQL",
+    "sql_db_query": "Running SQL",
+}
 
 
 class MessageClassifier(BaseModel):
@@ -22,6 +55,11 @@ class State(TypedDict):
     messages: Annotated[list, add_messages]
     message_type: str | None
     next: str | None
+    history: list
+    cached: bool
+    cacheable: bool
+    data_version: int
+    cache_vector: bytes | None
 
 
 class ChatModel:
@@ -36,52 +74,127 @@ class ChatModel:
             api_key=api_settings.GEMINI_API_KEY,
             temperature=0.7,
         )
-        self.formatted_date = datetime.now().strftime("%B %Y")
-        self.db = SQLDatabase.from_uri(api_settings.DATABASE_URL)
+        self.classifier_llm = self.llm_2.with_structured_output(MessageClassifier)
+        # DDL only: sample rows would cost prompt tokens on every analytical
+        # call and tell the agent nothing the column types don't.
+        self.db = SQLDatabase.from_uri(
+            api_settings.DATABASE_URL, sample_rows_in_table_info=0
+        )
         self.toolkit = SQLDatabaseToolkit(db=self.db, llm=self.llm_1)
-        self.tools = self.toolkit.get_tools()
-
-    def classify_message(self, state: State):
-        last_message = state["messages"][-1]
-        classifier_llm = self.llm_2.with_structured_output(MessageClassifier)
-
-        result = classifier_llm.invoke(
-            [
-                {
-                    "role": "system",
-                    "content": f"""
-                        Your task is to classify the user's intent into one of three specific categories.
-
-                        **Current Reference Date:** {self.formatted_date}
-                        Use this date as the "present" to determine if a request refers to the past or the future.
-
-                        **Categories:**
-                        1. "normal": General questions, greetings, or conversation. No database lookup needed.
-                        2. "analysis": Retrieving or analyzing data from the past up to the present ({self.formatted_date}).
-                        *Keywords: "What happened", "Current status", "Last month", "Previous year".*
-                        3. "forecasting": Predicting future trends or data points occurring after {self.formatted_date}.
-                        *Keywords: "What will happen", "Prediction", "Next quarter", "Future outlook".*
-                    """,
-                },
-                {"role": "user", "content": last_message.content},
-            ]
+        self.tools = cached_sql_tools(self.toolkit.get_tools())
+        # Reflected once at startup so the agent doesn't spend turns listing
+        # tables and fetching schemas on every question.
+        self.schema = self.db.get_table_info()
+        self.agent = self._build_agent()
+        self.graph = self._build_graph()
+        self._shadow_tasks = set()
+        self.data_version = DataVersion()
+        self.answer_cache = ChatAnswerCache(
+            embeddings=GoogleGenerativeAIEmbeddings(
+                model="models/gemini-embedding-001",
+                google_api_key=api_settings.GEMINI_API_KEY,
+            )
+            if api_settings.CHAT_CACHE_SEMANTIC
+            else None
         )
 
-        print(result)
-
-        return {"message_type": result.message_type}
-
-    def router(self, state: State):
+    @property
+    def formatted_date(self):
+        return datetime.now().strftime("%B %Y")
+
+    async def classify_message(self, state: State):
+        content = state["messages"][-1].content
+        local = classify_locally(content)
+
+        if is_confident(local):
+            intent_stats.record_fast_path()
+
+            if should_shadow_check():
+                task = asyncio.create_task(self._shadow_check(content, local))
+                self._shadow_tasks.add(task)
+                task.add_done_callback(self._shadow_tasks.discard)
+
+            return {"message_type": local.message_type}
+
+        message_type = await self._llm_classify(content)
+        intent_stats.record_escalation(local, message_type)
+
+        return {"message_type": message_type}
+
+    async def _shadow_check(self, content: str, local: LocalIntent):
+        intent_stats.record_comparison(local.message_type, await self._llm_classify(content))
+
+    async def _llm_classify(self, content: str) -> str:
+        with span("llm_classifier"):
+            result = await self.classifier_llm.ainvoke(
+                [
+                    {
+                        "role": "system",
+                        "content": f"""
+                            Your task is to classify the user's intent into one of three specific categories.
+
+                            **Current Reference Date:** {self.formatted_date}
+                            Use this date as the "present" to determine if a request refers to the past or the future.
+
+                            **Categories:**
+                            1. "normal": General questions, greetings, or conversation. No database lookup needed.
+                            2. "analysis": Retrieving or analyzing data from the past up to the present ({self.formatted_date}).
+                            *Keywords: "What happened", "Current status", "Last month", "Previous year".*
+                            3. "forecasting": Predicting future trends or data points occurring after {self.formatted_date}.
+                            *Keywords: "What will happen", "Prediction", "Next quarter", "Future outlook".*
+                        """,
+                    },
+                    {"role": "user", "content": content},
+                ]
+            )
+
+        return result.message_type
+
+    async def cache_lookup(self, state: State):
+        content = state["messages"][-1].content
+
+        # A follow-up is answered from this session's history or summary, so
+        # it must neither come from nor go into the shared cache. Standalone
+        # questions stay cacheable at any point in a session.
+        if state.get("history") and is_follow_up(content):
+            return {"cached": False, "cacheable": False}
+
+        try:
+            with span("redis_data_version"):
+                version = await self.data_version.get()
+        except RedisError:
+            return {"cached": False, "cacheable": False}
+
+        # The cache times its own embedding and Redis stages.
+        lookup = await self.answer_cache.get(content, state["message_type"], version)
+        if lookup.answer is None:
+            return {
+                "cached": False,
+                "cacheable": True,
+                "data_version": version,
+                "cache_vector": lookup.vector,
+            }
+
+        return {
+            "messages": [{"role": "assistant", "content": lookup.answer}],
+            "cached": True,
+            "cacheable": False,
+            "data_version": version,
+        }
+
+    async def router(self, state: State):
         message_type = state.get("message_type", "normal")
 
-        if message_type == "normal":
+        if state.get("cached"):
+            return {"next": "cached"}
+        elif message_type == "normal":
             return {"next": "normal"}
         elif message_type == "forecasting":
             return {"next": "forecasting"}
         else:
             return {"next": "analytical"}
 
-    def normal_agent(self, state: State):
+    async def normal_agent(self, state: State):
         last_message = state["messages"][-1]
 
         messages = [
@@ -120,16 +233,73 @@ class ChatModel:
                     Today is {self.formatted_date}. Use this to ground any general time-based advice.
                 """,
             },
+            *state.get("history", []),
             {"role": "user", "content": last_message.content},
         ]
-        reply = self.llm_1.invoke(messages)
+        with span("llm_normal"):
+            reply = await self.llm_1.ainvoke(messages)
+
+        return {"messages": [{"role": "assistant", "content": reply.content}]}
+
+    async def analytical_agent(self, state: State):
+        last_message = state["messages"][-1].content
+
+        with span("llm_analytical_agent"):
+            reply = await self.agent.ainvoke(
+                {
+                    "messages": [
+                        *state.get("history", []),
+                        {"role": "user", "content": last_message},
+                    ]
+                },
+                config={"recursion_limit": 50},
+            )
+
+        # last_message = result["messages"][-1]
+        # if isinstance(last_message.content, list):
+        #     return last_message.content[0].get("text", str(last_message.content[0]))
+        # return last_message.content
+
+        reply = reply["messages"][-1]
 
         return {"messages": [{"role": "assistant", "content": reply.content}]}
 
-    def analytical_agent(self, state: State):
+    async def forecasting_agent(self, state: State):
         last_message = state["messages"][-1].content
 
-        agent = create_agent(
+        products = await asyncio.to_thread(load_products)
+        query = parse_forecast_query(last_message, products)
+        series = await asyncio.to_thread(load_series, query)
+        as_of = await asyncio.to_thread(latest_period)
+
+        if series.empty:
+            reply = "There is no sales history to forecast from yet. Upload data on the Data Connect page first."
+            return {"messages": [{"role": "assistant", "content": reply}]}
+
+        # One batched inference on the in-process model; the LLM only phrases it.
+        forecaster = await asyncio.to_thread(get_forecaster)
+        if query.target == "revenue":
+            forecast = await forecaster.predict_revenue(
+                df=series, prediction_length=query.horizon, as_of=as_of
+            )
+        else:
+            forecast = await forecaster.predict_units(
+                df=series, prediction_length=query.horizon, as_of=as_of
+            )
+
+        with span("llm_forecasting"):
+            reply = await self.llm_1.ainvoke(
+                [
+                    {"role": "system", "content": forecast_prompt(query, series, forecast)},
+                    *state.get("history", []),
+                    {"role": "user", "content": last_message},
+                ]
+            )
+
+        return {"messages": [{"role": "assistant", "content": reply.content}]}
+
+    def _build_agent(self):
+        return create_agent(
             self.llm_1,
             self.tools,
             system_prompt="""
@@ -149,43 +319,30 @@ class ChatModel:
             DO NOT make any DML statements (INSERT, UPDATE, DELETE, DROP etc.) to the
             database.
 
-            To start you should ALWAYS look at the tables in the database to see what you
-            can query. Do NOT skip this step.
+            The schema of the database is below, so you do not need to list the tables
+            or fetch their schemas first. Only use those tools if the schema below does
+            not cover the question.
 
-            Then you should query the schema of the most relevant tables.
+            {schema}
             """.format(
                 dialect=self.db.dialect,
                 top_k=5,
+                schema=self.schema,
             ),
         )
 
-        reply = agent.invoke(
-            {"messages": [{"role": "user", "content": last_message}]},
-            config={"recursion_limit": 50},
-        )
-
-        # last_message = result["messages"][-1]
-        # if isinstance(last_message.content, list):
-        #     return last_message.content[0].get("text", str(last_message.content[0]))
-        # return last_message.content
-
-        reply = reply["messages"][-1]
-
-        return {"messages": [{"role": "assistant", "content": reply.content}]}
-
-    def forecasting_agent(self, state: State):
-        pass
-
-    def chat(self, user_input: str):
+    def _build_graph(self):
         graph_builder = StateGraph(State)
         graph_builder.add_node("classify_message", self.classify_message)
+        graph_builder.add_node("cache_lookup", self.cache_lookup)
         graph_builder.add_node("router", self.router)
         graph_builder.add_node("normal", self.normal_agent)
         graph_builder.add_node("forecasting", self.forecasting_agent)
         graph_builder.add_node("analytical", self.analytical_agent)
 
         graph_builder.add_edge(START, "classify_message")
-        graph_builder.add_edge("classify_message", "router")
+        graph_builder.add_edge("classify_message", "cache_lookup")
+        graph_builder.add_edge("cache_lookup", "router")
         graph_builder.add_conditional_edges(
             "router",
             lambda state: state.get("next"),
@@ -193,6 +350,7 @@ class ChatModel:
                 "normal": "normal",
                 "forecasting": "forecasting",
                 "analytical": "analytical",
+                "cached": END,
             },
         )
 
@@ -200,13 +358,113 @@ class ChatModel:
         graph_builder.add_edge(start_key="forecasting", end_key=END)
         graph_builder.add_edge(start_key="analytical", end_key=END)
 
-        graph = graph_builder.compile()
+        return graph_builder.compile()
 
-        state = {"messages": [], "message_type": None}
+    async def chat(self, user_input: str, history: list = None):
+        state = {"messages": [], "message_type": None, "history": history or []}
 
         state["messages"].append({"role": "user", "content": user_input})
-        state = graph.invoke(state)
-
-        llm_response = state["messages"][-1].content
+        state = await self.graph.ainvoke(state)
+
+        llm_response = message_text(state["messages"][-1].content)
+        await self._remember(user_input, state, llm_response)
+
+        return llm_response
+
+    async def _remember(self, user_input: str, state: State, answer: str):
+        if state.get("cacheable"):
+            await self.answer_cache.set(
+                user_input,
+                state["message_type"],
+                state["data_version"],
+                answer,
+                vector=state.get("cache_vector"),
+            )
+
+    async def stream(self, user_input: str, history: list = None):
+        """Yield (event, data) pairs: classification, agent steps, answer tokens, done"""
+        state = {
+            "messages": [{"role": "user", "content": user_input}],
+            "message_type": None,
+            "history": history or [],
+        }
+        final_state = None
+
+        async for namespace, mode, chunk in self.graph.astream(
+            state, stream_mode=["updates", "messages", "values"], subgraphs=True
+        ):
+            if mode == "values":
+                if not namespace:
+                    final_state = chunk
+                continue
+
+            if mode == "updates":
+                if not namespace and "classify_message" in chunk:
+                    yield "classification", chunk["classify_message"]
+
+                if not namespace and chunk.get("cache_lookup", {}).get("cached"):
+                    yield "token", {"text": chunk["cache_lookup"]["messages"][-1]["content"]}
+
+                continue
+
+            message, metadata = chunk
+            # Calls made inside the prebuilt agent are namespaced by the
+            # outer node ("analytical:<task id>").
+            node = (
+                namespace[0].split(":")[0]
+                if namespace
+                else metadata.get("langgraph_node")
+            )
+
+            # Streaming models send AIMessageChunks; a model or route that
+            # does not stream sends one whole AIMessage instead.
+            if node not in ANSWER_NODES or not isinstance(message, AIMessage):
+                continue
+
+            calls = (
+                message.tool_call_chunks
+                if isinstance(message, AIMessageChunk)
+                else message.tool_calls
+            )
+            for call in calls:
+                if call.get("name"):
+                    yield "step", {
+                        "tool": call["name"],
+                        "message": TOOL_STEPS.get(call["name"], f"Running {call['name']}"),
+                    }
+
+            text = message_text(message.content)
+            if text:
+                yield "token", {"text": text}
+
+        response = message_text(final_state["messages"][-1].content)
+        await self._remember(user_input, final_state, response)
+
+        yield "done", {"response": response, "cached": final_state.get("cached", False)}
+
+    async def summarize(self, summary: str | None, messages: list) -> str:
+        """Fold older messages into the rolling conversation summary"""
+        transcript = "\n".join(
+            f"{msg['role'].upper()}: {msg['content']}" for msg in messages
+        )
 
-        return llm_response[0]["text"]
+        with span("llm_summary"):
+            reply = await self.llm_2.ainvoke(
+                [
+                    {
+                        "role": "system",
+                        "content": """
+                            Update the summary of a conversation between a user and Sarah AI,
+                            an ERP assistant. Keep facts, figures, product names, time periods
+                            and open questions the user may refer back to. Drop greetings and
+                            small talk. Answer with the updated summary only, at most 200 words.
+                        """,
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}",
+                    },
+                ]
+            )
+
+        return message_text(reply.content)
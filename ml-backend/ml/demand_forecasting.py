@@ -1,83 +1,295 @@
-import torch
-from chronos import BaseChronosPipeline
+import asyncio
+import logging
+from dataclasses import dataclass
 import pandas as pd
 from pandas import DataFrame
+from settings.settings import api_settings
+from observability.metrics import Counter, span
 
+logger = logging.getLogger("sarah.forecasting")
 
-class ChronosForecaster:
-    def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = BaseChronosPipeline.from_pretrained(
-            "amazon/chronos-2", device_map=self.device
-        )
+QUANTILE_LEVELS = [0.1, 0.5, 0.9]
 
-    async def predict_units(self, df: DataFrame, prediction_length: int = 2):
-        df = pd.DataFrame(df)
+# Trailing months averaged by the baseline forecast.
+BASELINE_MONTHS = 3
 
-        df = df[["product_id", "period", "units_sold"]]
+# Columns sent to the model per target; units sold is a covariate for revenue.
+TARGET_COLUMNS = {
+    "units_sold": ["product_id", "period", "units_sold"],
+    "revenue": ["product_id", "period", "units_sold", "revenue"],
+}
 
-        pred = self.model.predict_df(
-            df,
-            prediction_length=prediction_length,
-            quantile_levels=[0.1, 0.5, 0.9],
-            id_column="product_id",
-            timestamp_column="period",
-            target="units_sold",
-        )
+forecast_series = Counter(
+    "forecast_series_total",
+    "Series forecast, by route (model or baseline)",
+    ("route",),
+)
+forecast_points = Counter(
+    "forecast_points_total",
+    "History points per route after preprocessing",
+    ("route",),
+)
+forecast_points_trimmed = Counter(
+    "forecast_points_trimmed_total",
+    "History points older than the forecast context window",
+)
+forecast_points_filled = Counter(
+    "forecast_points_filled_total",
+    "Missing months filled in before forecasting",
+)
 
-        pred["period"] = pred["period"].dt.strftime("%b %Y")
 
-        pred["predictions"] = round(pred["predictions"])
-        pred["units_0_1"] = round(pred["0.1"])
-        pred["units_0_5"] = round(pred["0.5"])
-        pred["units_0_9"] = round(pred["0.9"])
+@dataclass
+class PreparedSeries:
+    model: DataFrame
+    baseline: DataFrame
+    trimmed: int
+    filled: int
 
-        pred = pred.drop(columns=["0.1", "0.5", "0.9"])
 
-        return pred.to_dict(orient="records")
+def _month_index(periods) -> pd.Series:
+    periods = pd.to_datetime(periods)
+    return periods.dt.year * 12 + periods.dt.month - 1
 
-    async def predict_units_raw(self, df: DataFrame, prediction_length: int = 2):
-        df = pd.DataFrame(df)
 
-        df = df[["product_id", "period", "units_sold"]]
+def _month_start(index: pd.Series) -> pd.Series:
+    return pd.to_datetime(
+        pd.DataFrame({"year": index // 12, "month": index % 12 + 1, "day": 1})
+    )
 
-        pred = self.model.predict_df(
-            df,
-            prediction_length=prediction_length,
-            quantile_levels=[0.1, 0.5, 0.9],
-            id_column="product_id",
-            timestamp_column="period",
-            target="units_sold",
-        )
 
-        pred["predictions"] = round(pred["predictions"])
-        pred["0.1"] = round(pred["0.1"])
-        pred["0.5"] = round(pred["0.5"])
-        pred["0.9"] = round(pred["0.9"])
+def prepare_series(df, target: str, as_of=None) -> PreparedSeries:
+    """Monthly, gap-free series up to the as-of month, split by route.
+
+    as_of is the month the data runs to: a period, a Series of periods by
+    product id, or by default the latest period in df. Every series is
+    capped to the context window before it and extended to it, with months
+    after a series' last record counted as no demand, so no series is ever
+    dropped. Short series and series without demand in the last
+    FORECAST_DEAD_MONTHS go to the baseline forecast; the rest go to the
+    model.
+    """
+    columns = TARGET_COLUMNS[target]
+    values = columns[2:]
+
+    df = pd.DataFrame(df)[columns].copy()
+    df["product_id"] = df["product_id"].astype(str)
+    df["month"] = _month_index(df["period"])
+
+    if as_of is None:
+        df["as_of"] = df["month"].max()
+    elif isinstance(as_of, pd.Series):
+        df["as_of"] = df["product_id"].map(_month_index(as_of))
+    else:
+        df["as_of"] = _month_index(pd.Series([as_of])).iloc[0]
+
+    observed = df.groupby("product_id").agg(
+        min=("month", "min"),
+        max=("month", "max"),
+        as_of=("as_of", "first"),
+    ).astype("int64")
+
+    recent = (df["month"] > df["as_of"] - api_settings.FORECAST_CONTEXT_MONTHS) & (
+        df["month"] <= df["as_of"]
+    )
+    trimmed = int((~recent).sum())
+    df = df[recent].drop(columns="period")
+
+    # One row per month from each series' first period in the window to the
+    # as-of month. A series with no records left in the window keeps the
+    # whole window, all zero demand, so it gets a zero baseline forecast
+    # instead of disappearing from the result.
+    window_start = observed["as_of"] - api_settings.FORECAST_CONTEXT_MONTHS + 1
+    observed["min"] = observed["min"].clip(lower=window_start).clip(upper=observed["as_of"])
+    observed["count"] = (
+        df.groupby("product_id")["month"].count().reindex(observed.index, fill_value=0)
+    )
+    lengths = (observed["as_of"] - observed["min"] + 1).to_numpy()
+    full = pd.DataFrame({"product_id": observed.index.repeat(lengths)})
+    full["month"] = (
+        observed["min"].to_numpy().repeat(lengths)
+        + full.groupby("product_id").cumcount().to_numpy()
+    )
+    df = full.merge(df.drop(columns="as_of"), on=["product_id", "month"], how="left")
+
+    filled = int(df[target].isna().sum())
+    if filled:
+        stale = df["month"] > df["product_id"].map(observed["max"])
+        df.loc[stale, values] = 0
+        if api_settings.FORECAST_FILL_METHOD == "ffill":
+            df[values] = df.groupby("product_id")[values].ffill()
+        df[values] = df[values].fillna(0)
+
+    as_of_month = df["product_id"].map(observed["as_of"])
+    recent_demand = (
+        df[df["month"] > as_of_month - api_settings.FORECAST_DEAD_MONTHS]
+        .groupby("product_id")[target]
+        .sum()
+    )
+    baseline_ids = observed.index[
+        (observed["count"] < api_settings.FORECAST_MIN_HISTORY_MONTHS)
+        | (recent_demand.reindex(observed.index) <= 0)
+    ]
+
+    df["period"] = _month_start(df["month"])
+    df = df[columns]
+    to_baseline = df["product_id"].isin(baseline_ids)
+
+    return PreparedSeries(
+        model=df[~to_baseline],
+        baseline=df[to_baseline],
+        trimmed=trimmed,
+        filled=filled,
+    )
+
+
+def baseline_forecast(df: DataFrame, target: str, prediction_length: int) -> DataFrame:
+    """Flat forecast at the recent mean, shaped like predict_df output"""
+    series = df.groupby("product_id")
+    level = series.tail(BASELINE_MONTHS).groupby("product_id")[target].mean()
+    low = series[target].quantile(0.1)
+    high = series[target].quantile(0.9)
+    last = series["period"].max()
+
+    return pd.DataFrame(
+        [
+            {
+                "product_id": product_id,
+                "period": last[product_id] + pd.DateOffset(months=step),
+                "target_name": target,
+                "predictions": value,
+                "0.1": min(low[product_id], value),
+                "0.5": value,
+                "0.9": max(high[product_id], value),
+            }
+            for product_id, value in level.items()
+            for step in range(1, prediction_length + 1)
+        ]
+    )
+
+
+def _report(prepared: PreparedSeries, target: str):
+    model_series = prepared.model["product_id"].nunique()
+    baseline_series = prepared.baseline["product_id"].nunique()
+
+    forecast_series.inc(model_series, route="model")
+    forecast_series.inc(baseline_series, route="baseline")
+    forecast_points.inc(len(prepared.model), route="model")
+    forecast_points.inc(len(prepared.baseline), route="baseline")
+    forecast_points_trimmed.inc(prepared.trimmed)
+    forecast_points_filled.inc(prepared.filled)
+
+    logger.info(
+        "Forecast %s: %d series / %d points to the model, %d series to the baseline, "
+        "%d points trimmed, %d months filled",
+        target,
+        model_series,
+        len(prepared.model),
+        baseline_series,
+        prepared.trimmed,
+        prepared.filled,
+    )
 
-        return pred.to_dict(orient="records")
 
-    async def predict_revenue(self, df: DataFrame, prediction_length: int = 2):
-        df = pd.DataFrame(df)
+def format_units(pred: DataFrame) -> list:
+    pred["period"] = pred["period"].dt.strftime("%b %Y")
 
-        df = df[["product_id", "period", "units_sold", "revenue"]]
+    pred["predictions"] = round(pred["predictions"])
+    pred["units_0_1"] = round(pred["0.1"])
+    pred["units_0_5"] = round(pred["0.5"])
+    pred["units_0_9"] = round(pred["0.9"])
 
-        pred = self.model.predict_df(
-            df,
-            prediction_length=prediction_length,
-            quantile_levels=[0.1, 0.5, 0.9],
-            id_column="product_id",
-            timestamp_column="period",
-            target="revenue",
+    pred = pred.drop(columns=["0.1", "0.5", "0.9"])
+
+    return pred.to_dict(orient="records")
+
+
+def format_units_raw(pred: DataFrame) -> list:
+    pred["predictions"] = round(pred["predictions"])
+    pred["0.1"] = round(pred["0.1"])
+    pred["0.5"] = round(pred["0.5"])
+    pred["0.9"] = round(pred["0.9"])
+
+    return pred.to_dict(orient="records")
+
+
+def format_revenue(pred: DataFrame) -> list:
+    pred["period"] = pred["period"].dt.strftime("%b %Y")
+
+    pred["predictions"] = round(pred["predictions"])
+    pred["revenue_0_1"] = round(pred["0.1"])
+    pred["revenue_0_5"] = round(pred["0.5"])
+    pred["revenue_0.9"] = round(pred["0.9"])
+
+    pred = pred.drop(columns=["0.1", "0.5", "0.9"])
+
+    return pred.to_dict(orient="records")
+
+
+# predict_* method name -> (target column, response formatter)
+PREDICTIONS = {
+    "units": ("units_sold", format_units),
+    "units_raw": ("units_sold", format_units_raw),
+    "revenue": ("revenue", format_revenue),
+}
+
+
+class ChronosForecaster:
+    def __init__(self):
+        # Imported here so that importing this module stays cheap; torch and
+        # chronos are only needed once a model is actually loaded.
+        import torch
+        from chronos import BaseChronosPipeline
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = BaseChronosPipeline.from_pretrained(
+            "amazon/chronos-2", device_map=self.device
         )
 
-        pred["period"] = pred["period"].dt.strftime("%b %Y")
+    def predict_frame(
+        self, df, target: str, prediction_length: int, as_of=None
+    ) -> DataFrame:
+        """Quantile forecast for every series in df, one row per product and period"""
+        with span("forecast_preprocess"):
+            prepared = prepare_series(df, target, as_of)
+        _report(prepared, target)
+
+        frames = []
+        if not prepared.model.empty:
+            frames.append(self._predict_model(prepared.model, target, prediction_length))
+        if not prepared.baseline.empty:
+            frames.append(baseline_forecast(prepared.baseline, target, prediction_length))
+
+        if not frames:
+            raise ValueError("No series to forecast")
+
+        return pd.concat(frames, ignore_index=True)
+
+    def _predict_model(self, df: DataFrame, target: str, prediction_length: int) -> DataFrame:
+        with span("chronos_predict"):
+            return self.model.predict_df(
+                df,
+                prediction_length=prediction_length,
+                quantile_levels=QUANTILE_LEVELS,
+                id_column="product_id",
+                timestamp_column="period",
+                target=target,
+            )
+
+    async def predict(self, method: str, df, prediction_length: int, as_of=None) -> list:
+        target, format_prediction = PREDICTIONS[method]
+        # Inference is CPU/GPU bound; run it off the event loop so other
+        # requests keep being served meanwhile.
+        pred = await asyncio.to_thread(
+            self.predict_frame, df, target, prediction_length, as_of
+        )
+        return format_prediction(pred)
 
-        pred["predictions"] = round(pred["predictions"])
-        pred["revenue_0_1"] = round(pred["0.1"])
-        pred["revenue_0_5"] = round(pred["0.5"])
-        pred["revenue_0.9"] = round(pred["0.9"])
+    async def predict_units(self, df: DataFrame, prediction_length: int = 2, as_of=None):
+        return await self.predict("units", df, prediction_length, as_of)
 
-        pred = pred.drop(columns=["0.1", "0.5", "0.9"])
+    async def predict_units_raw(self, df: DataFrame, prediction_length: int = 2, as_of=None):
+        return await self.predict("units_raw", df, prediction_length, as_of)
 
-        return pred.to_dict(orient="records")
+    async def predict_revenue(self, df: DataFrame, prediction_length: int = 2, as_of=None):
+        return await self.predict("revenue", df, prediction_length, as_of)
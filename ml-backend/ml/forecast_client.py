@@ -0,0 +1,49 @@
+import httpx
+from settings.settings import api_settings
+
+
+def _transport(address: str):
+    """`unix:/path/to.sock` or an http(s) base URL such as http://127.0.0.1:8100"""
+    if address.startswith("unix:"):
+        return "http://forecast", httpx.AsyncHTTPTransport(uds=address[len("unix:"):])
+
+    return address, None
+
+
+class ForecastClient:
+    """Same predict_* interface as ChronosForecaster, served by `python -m ml.forecast_server`"""
+
+    def __init__(self, address: str = None):
+        base_url, transport = _transport(address or api_settings.FORECAST_SERVER_ADDRESS)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=api_settings.FORECAST_SERVER_TIMEOUT_SECONDS,
+        )
+
+    async def predict(self, method: str, df, prediction_length: int, as_of=None) -> list:
+        import pandas as pd
+
+        records = pd.DataFrame(df).to_dict(orient="records")
+
+        response = await self.client.post(
+            "/predict",
+            json={
+                "method": method,
+                "prediction_length": prediction_length,
+                "records": records,
+                "as_of": None if as_of is None else str(as_of),
+            },
+        )
+        response.raise_for_status()
+
+        return response.json()["predictions"]
+
+    async def predict_units(self, df, prediction_length: int = 2, as_of=None):
+        return await self.predict("units", df, prediction_length, as_of)
+
+    async def predict_units_raw(self, df, prediction_length: int = 2, as_of=None):
+        return await self.predict("units_raw", df, prediction_length, as_of)
+
+    async def predict_revenue(self, df, prediction_length: int = 2, as_of=None):
+        return await self.predict("revenue", df, prediction_length, as_of)
@@ -0,0 +1,268 @@
+"""Local forecasting sidecar that owns the only Chronos model on a host.
+
+API workers reach it through ForecastClient when FORECAST_SERVER_ADDRESS is
+set, instead of each loading their own copy of the model:
+
+    python -m ml.forecast_server --address unix:/tmp/sarah-forecast.sock
+    python -m ml.forecast_server --address http://127.0.0.1:8100
+
+Requests arriving within FORECAST_BATCH_WINDOW_MS of each other are sent to
+the model together, one predict_df call per (target, prediction length).
+Chronos forecasts every series id independently, so a batched forecast is the
+same as forecasting each request on its own.
+"""
+import asyncio
+import logging
+import argparse
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Literal, Optional
+from urllib.parse import urlparse
+import pandas as pd
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field, model_validator
+from settings.settings import api_settings
+from ml.demand_forecasting import ChronosForecaster, PREDICTIONS, TARGET_COLUMNS
+from observability.metrics import Histogram, render_metrics
+
+logger = logging.getLogger("sarah.forecast_server")
+
+# Joins the request index and the product id of a series inside a batch.
+SEPARATOR = "\x1f"
+
+batch_requests = Histogram(
+    "forecast_batch_requests",
+    "Requests served by one model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+batch_series = Histogram(
+    "forecast_batch_series",
+    "Series sent to the model in one call",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+class ForecastRecord(BaseModel):
+    product_id: str
+    period: str
+    units_sold: Optional[float] = None
+    revenue: Optional[float] = None
+
+
+class PredictRequest(BaseModel):
+    method: Literal["units", "units_raw", "revenue"]
+    prediction_length: int = Field(2, ge=1, le=24)
+    records: list[ForecastRecord] = Field(min_length=1)
+    # Month the data runs to; the latest record period when not given.
+    as_of: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_columns(self):
+        target, _ = PREDICTIONS[self.method]
+        required = TARGET_COLUMNS[target][2:]
+
+        for index, record in enumerate(self.records):
+            missing = [column for column in required if getattr(record, column) is None]
+            if missing:
+                raise ValueError(f"records[{index}] is missing {', '.join(missing)}")
+
+        return self
+
+
+@dataclass
+class PendingForecast:
+    method: str
+    prediction_length: int
+    records: list
+    as_of: Optional[str]
+    future: asyncio.Future
+
+    @property
+    def series(self) -> int:
+        return len({record["product_id"] for record in self.records})
+
+
+class ForecastBatcher:
+    def __init__(self, forecaster: ChronosForecaster):
+        self.forecaster = forecaster
+        self.queue: asyncio.Queue[PendingForecast] = asyncio.Queue()
+        self.window = api_settings.FORECAST_BATCH_WINDOW_MS / 1000
+        self.max_series = api_settings.FORECAST_BATCH_MAX_SERIES
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def submit(
+        self, method: str, prediction_length: int, records: list, as_of: str = None
+    ) -> list:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(
+            PendingForecast(method, prediction_length, records, as_of, future)
+        )
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            series = batch[0].series
+            deadline = loop.time() + self.window
+
+            while series < self.max_series:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(pending)
+                series += pending.series
+
+            groups = defaultdict(list)
+            for pending in batch:
+                target, _ = PREDICTIONS[pending.method]
+                groups[(target, pending.prediction_length)].append(pending)
+
+            for (target, prediction_length), group in groups.items():
+                await self._predict_isolated(target, prediction_length, group)
+
+    async def _predict_isolated(self, target: str, prediction_length: int, group: list):
+        """Errors fail only the affected requests and never stop the batcher"""
+        try:
+            await self._predict_group(target, prediction_length, group)
+            return
+        except Exception as e:
+            logger.exception("Forecast batch of %d requests failed", len(group))
+            error = e
+
+        if len(group) == 1:
+            if not group[0].future.done():
+                group[0].future.set_exception(error)
+            return
+
+        # Retry one by one so a single bad request doesn't fail the others.
+        for pending in group:
+            if not pending.future.done():
+                await self._predict_isolated(target, prediction_length, [pending])
+
+    async def _predict_group(self, target: str, prediction_length: int, group: list):
+        frames, as_of = [], []
+        for index, pending in enumerate(group):
+            frame = pd.DataFrame(pending.records)
+            frame["product_id"] = f"{index}{SEPARATOR}" + frame["product_id"].astype(str)
+            frames.append(frame)
+
+            # Staleness is judged per request, never against another
+            # request's data in the same batch.
+            frame_as_of = (
+                pd.to_datetime(pending.as_of)
+                if pending.as_of
+                else pd.to_datetime(frame["period"]).max()
+            )
+            as_of.append(pd.Series(frame_as_of, index=frame["product_id"].unique()))
+
+        combined = pd.concat(frames, ignore_index=True)
+        batch_requests.observe(len(group))
+        batch_series.observe(combined["product_id"].nunique())
+
+        pred = await asyncio.to_thread(
+            self.forecaster.predict_frame,
+            combined,
+            target,
+            prediction_length,
+            pd.concat(as_of),
+        )
+
+        ids = pred["product_id"].str.split(SEPARATOR, n=1, expand=True)
+        request_index = ids[0].astype(int)
+        pred["product_id"] = ids[1]
+
+        for index, pending in enumerate(group):
+            if pending.future.done():
+                continue
+            _, format_prediction = PREDICTIONS[pending.method]
+            part = pred[request_index == index].reset_index(drop=True)
+            try:
+                pending.future.set_result(format_prediction(part))
+            except Exception as e:
+                pending.future.set_exception(e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    forecaster = await asyncio.to_thread(ChronosForecaster)
+    app.state.batcher = ForecastBatcher(forecaster)
+    app.state.batcher.start()
+    yield
+    app.state.batcher.task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.post("/predict")
+async def predict(request: PredictRequest):
+    if not app.state.batcher.alive:
+        raise HTTPException(status_code=503, detail="Forecast batcher is not running")
+
+    try:
+        predictions = await app.state.batcher.submit(
+            request.method,
+            request.prediction_length,
+            [record.model_dump() for record in request.records],
+            request.as_of,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Forecasting error: {str(e)}")
+
+    return {"predictions": predictions}
+
+
+@app.get("/health")
+def health():
+    batcher = app.state.batcher
+    body = {
+        "status": "ok" if batcher.alive else "batcher stopped",
+        "queued": batcher.queue.qsize(),
+    }
+
+    if not batcher.alive:
+        return JSONResponse(body, status_code=503)
+
+    return body
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--address", default=api_settings.FORECAST_SERVER_ADDRESS)
+    args = parser.parse_args()
+
+    if not args.address:
+        parser.error("pass --address or set FORECAST_SERVER_ADDRESS")
+
+    if args.address.startswith("unix:"):
+        uvicorn.run(app, uds=args.address[len("unix:"):])
+    else:
+        url = urlparse(args.address)
+        uvicorn.run(app, host=url.hostname, port=url.port or 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import re
+import pandas as pd
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import func
+from db.database import SessionLocal
+from db.product import Product
+from observability.metrics import span
+
+DEFAULT_HORIZON = 3
+MAX_HORIZON = 12
+
+HORIZON = re.compile(
+    r"\bnext\s+(?:(\d+)\s+)?(week|month|quarter|year)s?\b", re.IGNORECASE
+)
+REVENUE = re.compile(r"\b(revenue|income|earnings|turnover|dollars?|money)\b|\$", re.IGNORECASE)
+
+UNITS_PER_PERIOD = {"week": 0.25, "month": 1, "quarter": 3, "year": 12}
+
+
+@dataclass
+class ForecastQuery:
+    target: str
+    horizon: int
+    product_id: Optional[str] = None
+    product_name: Optional[str] = None
+
+
+def _mentions(text: str, term: str) -> bool:
+    """Whole-word match, so a product called Tea is not found in team"""
+    return re.search(rf"(?<!\w){re.escape(term)}(?!\w)", text) is not None
+
+
+def parse_forecast_query(message: str, products: dict) -> ForecastQuery:
+    """Pick target, horizon (months) and product out of a forecasting question"""
+    target = "revenue" if REVENUE.search(message) else "units_sold"
+
+    horizon = DEFAULT_HORIZON
+    match = HORIZON.search(message)
+    if match:
+        count = int(match.group(1) or 1)
+        horizon = max(1, round(count * UNITS_PER_PERIOD[match.group(2).lower()]))
+    horizon = min(horizon, MAX_HORIZON)
+
+    lowered = message.lower()
+    product_id, product_name = None, None
+    for pid, name in sorted(products.items(), key=lambda p: -len(p[1])):
+        if _mentions(lowered, name.lower()) or _mentions(lowered, pid.lower()):
+            product_id, product_name = pid, name
+            break
+
+    return ForecastQuery(target, horizon, product_id, product_name)
+
+
+def load_products() -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.query(Product.Product_ID, Product.Product_Name).distinct().all()
+        return {row.Product_ID: row.Product_Name for row in rows}
+    finally:
+        db.close()
+
+
+def latest_period() -> Optional[str]:
+    """Most recent period in the catalog, the as-of month for forecasts"""
+    db = SessionLocal()
+    try:
+        return db.query(func.max(Product.Period)).scalar()
+    finally:
+        db.close()
+
+
+def load_series(query: ForecastQuery) -> pd.DataFrame:
+    """Monthly history for one product, or totals across all products"""
+    db = SessionLocal()
+    try:
+        if query.product_id:
+            rows = (
+                db.query(Product.Period, Product.Units_Sold, Product.Revenue)
+                .filter(Product.Product_ID == query.product_id)
+                .order_by(Product.Period)
+                .all()
+            )
+        else:
+            rows = (
+                db.query(
+                    Product.Period,
+                    func.sum(Product.Units_Sold).label("Units_Sold"),
+                    func.sum(Product.Revenue).label("Revenue"),
+                )
+                .group_by(Product.Period)
+                .order_by(Product.Period)
+                .all()
+            )
+    finally:
+        db.close()
+
+    with span("dataframe"):
+        return pd.DataFrame(
+            [
+                {
+                    "product_id": query.product_id or "All",
+                    "period": row.Period,
+                    "units_sold": row.Units_Sold,
+                    "revenue": round(row.Revenue, 2),
+                }
+                for row in rows
+            ]
+        )
+
+
+def forecast_prompt(query: ForecastQuery, history: pd.DataFrame, forecast: list) -> str:
+    label = "revenue ($)" if query.target == "revenue" else "units sold"
+    subject = query.product_name or "all products combined"
+    low, high = (
+        ("revenue_0_1", "revenue_0.9")
+        if query.target == "revenue"
+        else ("units_0_1", "units_0_9")
+    )
+
+    recent = "\n".join(
+        f"{pd.to_datetime(row['period']).strftime('%b %Y')}: {row[query.target]}"
+        for row in history.tail(3).to_dict(orient="records")
+    )
+    predicted = "\n".join(
+        f"{row['period']}: {row['predictions']:.0f} (80% range {row[low]:.0f}–{row[high]:.0f})"
+        for row in forecast
+    )
+
+    return f"""
+        You are Sarah AI, the forecasting assistant of an ERP system. Answer the user's
+        question using only the forecast below. Be concise, bold every number, and mention
+        the uncertainty range when it matters for the decision.
+
+        Forecast of {label} for {subject}, next {query.horizon} month(s):
+        {predicted}
+
+        Most recent actuals:
+        {recent}
+    """
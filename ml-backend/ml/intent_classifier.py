@@ -0,0 +1,143 @@
+import re
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from settings.settings import api_settings
+
+GREETING = re.compile(
+    r"^\s*(hi|hello|hey|hiya|yo|good (morning|afternoon|evening)|thanks|thank you|"
+    r"bye|goodbye|who are you|what can you do|help)\b",
+    re.IGNORECASE,
+)
+
+FORECASTING = re.compile(
+    r"\b(forecast\w*|predict\w*|projection\w*|projected|upcoming|future|outlook|"
+    r"expect(ed)?|going to|will (i|we|it|they|sales|revenue|demand|stock)|"
+    r"next (week|month|quarter|year|\d+ (weeks|months|quarters|years)))\b",
+    re.IGNORECASE,
+)
+
+HISTORICAL = re.compile(
+    r"\b(last (week|month|quarter|year)|previous|so far|this (month|quarter|year)|"
+    r"(was|were|did|had)\b|in (19|20)\d{2}|ytd|to date|history|historical)",
+    re.IGNORECASE,
+)
+
+DATA = re.compile(
+    r"\b(revenue|sales|sold|units?|stock|inventory|profit|margin|price|cost|"
+    r"orders?|products?|categor(y|ies)|top \d*|best[- ]selling|how (many|much)|"
+    r"total|average|compare|trend)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class LocalIntent:
+    message_type: Optional[str]
+    confidence: float
+    source: str = "rules"
+
+
+class IntentStats:
+    def __init__(self):
+        self.total = 0
+        self.fast_path = 0
+        self.escalated = 0
+        self.compared = 0
+        self.agreed = 0
+
+    def record_fast_path(self):
+        self.total += 1
+        self.fast_path += 1
+
+    def record_escalation(self, local: LocalIntent, llm_type: str):
+        self.total += 1
+        self.escalated += 1
+        if local.message_type is not None:
+            self.record_comparison(local.message_type, llm_type)
+
+    def record_comparison(self, local_type: str, llm_type: str):
+        self.compared += 1
+        if local_type == llm_type:
+            self.agreed += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "total": self.total,
+            "fast_path": self.fast_path,
+            "escalated": self.escalated,
+            "fast_path_rate": self.fast_path / self.total if self.total else 0.0,
+            "compared": self.compared,
+            "agreement_rate": self.agreed / self.compared if self.compared else 0.0,
+        }
+
+
+intent_stats = IntentStats()
+
+
+def _classify_rules(message: str) -> LocalIntent:
+    words = len(message.split())
+    forecasting = FORECASTING.search(message) is not None
+    historical = HISTORICAL.search(message) is not None
+    data = DATA.search(message) is not None
+
+    # Forecasting and data patterns win over a leading greeting ("Hi, can you
+    # forecast ..."); forecasting words alone ("the future of AI") are not
+    # enough to send a message to the model.
+    if forecasting:
+        return LocalIntent("forecasting", 0.9 if data and not historical else 0.5)
+
+    if data:
+        return LocalIntent("analytical", 0.85 if historical else 0.7)
+
+    if GREETING.search(message) and words <= 8:
+        return LocalIntent("normal", 0.95)
+
+    if words <= 3:
+        return LocalIntent("normal", 0.7)
+
+    return LocalIntent(None, 0.0)
+
+
+@lru_cache
+def _load_model():
+    """Optional text classifier (e.g. a scikit-learn pipeline) saved with joblib"""
+    if not api_settings.INTENT_MODEL_PATH:
+        return None
+
+    import joblib
+
+    return joblib.load(api_settings.INTENT_MODEL_PATH)
+
+
+def _classify_model(message: str) -> Optional[LocalIntent]:
+    model = _load_model()
+    if model is None:
+        return None
+
+    probabilities = model.predict_proba([message])[0]
+    best = probabilities.argmax()
+
+    return LocalIntent(str(model.classes_[best]), float(probabilities[best]), "model")
+
+
+def classify_locally(message: str) -> LocalIntent:
+    """Classify a message without calling the LLM, with a confidence score"""
+    intent = _classify_rules(message)
+
+    if intent.confidence < api_settings.INTENT_FAST_PATH_THRESHOLD:
+        model_intent = _classify_model(message)
+        if model_intent is not None and model_intent.confidence > intent.confidence:
+            return model_intent
+
+    return intent
+
+
+def is_confident(intent: LocalIntent) -> bool:
+    return intent.confidence >= api_settings.INTENT_FAST_PATH_THRESHOLD
+
+
+def should_shadow_check() -> bool:
+    """Sample fast-path answers to also be checked against the LLM"""
+    return random.random() < api_settings.INTENT_SHADOW_SAMPLE_RATE
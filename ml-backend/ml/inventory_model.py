@@ -1,47 +1,107 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Optional
+from redis.exceptions import RedisError
 from settings.settings import api_settings
+from redis_client.insight_cache import InsightCache
+from ml.messages import message_text
+from observability.metrics import span
+
+logger = logging.getLogger("sarah.inventory_insight")
+
+INSIGHT_MODEL = "gemini-3-flash-preview"
+
+# Summaries currently being generated by this worker, keyed by cache key.
+_inflight: dict[str, asyncio.Task] = {}
 
 
 class InventoryModel:
     def __init__(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self.model_name = INSIGHT_MODEL
         self.llm_1 = ChatGoogleGenerativeAI(
-            model="gemini-3-flash-preview",
+            model=self.model_name,
             api_key=api_settings.GEMINI_API_KEY,
             temperature=0.7,
         )
 
-    def _inventory_prompt(self, inventory):
-        prompt = f"""
-        Act as a Supply Chain Strategist. Analyze the provided inventory data and provide a response strictly following the structure and formatting rules below.
-
-        ### Formatting Rules:
-        1. **Headings:** Use `###` for the three main section headers.
-        2. **Bold Numbers:** Every single numerical value (quantities, dates, dollar amounts) MUST be wrapped in double asterisks, e.g., **149.0** or **23,563.63**.
-        3. **Currency:** Precede all financial values with a `$` sign inside the bolding, e.g., **$5,200.00**.
-        4. **Output:** Provide the answer to the query and nothing else. No introductory or concluding remarks.
-
-        ### Example Format Reference:
-        ### Stockout Risk Timeline
-        [1-2 sentence summary. Ensure months like **January 2026** are bolded].
-
-        ### Financial Projections (**[Start Month]** – **[End Month]**)
-        If you maintain stock to meet the full forecasted demand, your business could achieve the following:
-        * Total Projected Revenue: **$[Sum of revenue_3m]**
-        * Total Projected Profit: **$[Sum of profit_3m]**
-        * Top Profit Contributor: [Item Name] is your most valuable item, projected to generate **$[Value]** in profit over the next three months.
-
-        ### Required Replenishment
-        To avoid stockouts and capture the full revenue potential, you need to order at least the following quantities immediately:
-        * [Item]: **[gap_to_order]** units
-
-        ---
-        **Current Inventory Data to Analyze:**
-        {inventory}
-        """
-
-        return prompt
-
-    def inventory_insight(self, inventory):
-        prompt = self._inventory_prompt(inventory)
-        ai_msg = self.llm_1.invoke(prompt)
-        return ai_msg.content[0]["text"]
+    async def acomplete(self, prompt: str):
+        with span("llm_inventory_insight"):
+            ai_msg = await self.llm_1.ainvoke(prompt)
+        return message_text(ai_msg.content)
+
+
+@lru_cache
+def get_inventory_model() -> InventoryModel:
+    """Shared insight client, built on first use"""
+    return InventoryModel()
+
+
+async def get_cached_insight(inventory) -> tuple[str, Optional[str]]:
+    cache = InsightCache()
+    key = cache.make_key(inventory, INSIGHT_MODEL)
+
+    try:
+        with span("redis_insight_cache"):
+            return key, await cache.get(key)
+    except RedisError:
+        logger.warning("Insight cache lookup failed", exc_info=True)
+        return key, None
+
+
+def _finished(key: str, task: asyncio.Task):
+    _inflight.pop(key, None)
+
+    # Background generations have nobody awaiting them, so report here.
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Inventory insight generation failed", exc_info=task.exception())
+
+
+def generate_insight(key: str, prompt: str) -> asyncio.Task:
+    """Start generating a summary, or join the generation already in flight"""
+    task = _inflight.get(key)
+
+    if task is None:
+        task = asyncio.create_task(_generate_insight(key, prompt))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _finished(key, done))
+
+    return task
+
+
+async def _generate_insight(key: str, prompt: str) -> str:
+    cache = InsightCache()
+
+    try:
+        # Another worker holds the lock: wait for its summary instead of
+        # sending the same inventory to the LLM again.
+        while not await cache.acquire(key):
+            summary = await cache.get(key)
+            if summary is not None:
+                return summary
+            await asyncio.sleep(0.5)
+
+        summary = await cache.get(key)
+    except RedisError:
+        logger.warning("Insight cache unavailable, generating without it", exc_info=True)
+        return await get_inventory_model().acomplete(prompt)
+
+    try:
+        if summary is None:
+            summary = await get_inventory_model().acomplete(prompt)
+            await cache.set(key, summary)
+
+        return summary
+
+    except RedisError:
+        logger.warning("Could not cache inventory insight", exc_info=True)
+        return summary
+
+    finally:
+        try:
+            await cache.release(key)
+        except RedisError:
+            # The lock expires after INSIGHT_LOCK_TTL_SECONDS anyway.
+            logger.warning("Could not release insight lock", exc_info=True)
@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from settings.settings import api_settings
+
+# Rough characters-per-token ratio for English text and compact tables.
+CHARS_PER_TOKEN = 4
+
+TABLE_HEADER = "item|stock|fc_3m|gap|stockout"
+
+
+@dataclass
+class InventoryPrompt:
+    text: str
+    token_estimate: int
+    total_items: int
+    at_risk_items: int
+    included_items: int
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _stockout_date(item):
+    month = item.get("predicted_stockout_month")
+    if not month:
+        return None
+
+    return datetime.strptime(month, "%b %Y")
+
+
+def _is_at_risk(item, horizon_end: datetime) -> bool:
+    stockout = _stockout_date(item)
+
+    return item["replenishment_needed"] > 0 or (
+        stockout is not None and stockout <= horizon_end
+    )
+
+
+def _risk_order(item):
+    stockout = _stockout_date(item)
+
+    return (stockout is None, stockout or datetime.max, -item["replenishment_needed"])
+
+
+def _row(item) -> str:
+    return "|".join(
+        [
+            item["product_name"],
+            str(round(item["stock_on_hand"])),
+            str(round(item["prediction_3m"])),
+            str(max(round(item["replenishment_needed"]), 0)),
+            item.get("predicted_stockout_month") or "-",
+        ]
+    )
+
+
+def _template(
+    start_month, end_month, total_revenue, total_profit, top_item, rows, omitted
+):
+    table = "\n".join([TABLE_HEADER, *rows]) if rows else "(no items at risk)"
+    note = f"\n({omitted} lower-risk items omitted)" if omitted else ""
+
+    return f"""Act as a Supply Chain Strategist. Using the pre-computed figures and the at-risk items below, respond strictly following the structure and formatting rules. Do not recompute the figures.
+
+### Formatting Rules:
+1. **Headings:** Use `###` for the three section headers.
+2. **Bold Numbers:** Wrap every numerical value (quantities, dates, dollar amounts) in double asterisks, e.g., **149** or **23,563.63**.
+3. **Currency:** Precede financial values with a `$` inside the bolding, e.g., **$5,200.00**.
+4. **Output:** The answer only. No introductory or concluding remarks.
+
+### Stockout Risk Timeline
+[1-2 sentences on the at-risk items, bolding months like **January 2026**].
+
+### Financial Projections (**{start_month}** – **{end_month}**)
+If you maintain stock to meet the full forecasted demand, your business could achieve the following:
+* Total Projected Revenue: **${total_revenue:,.2f}**
+* Total Projected Profit: **${total_profit:,.2f}**
+* Top Profit Contributor: {top_item["product_name"]} is your most valuable item, projected to generate **${top_item["total_projected_profit_3m"]:,.2f}** in profit over the next three months.
+
+### Required Replenishment
+To avoid stockouts and capture the full revenue potential, you need to order at least the following quantities immediately:
+* [item]: **[gap]** units (one line per at-risk item with gap > 0)
+
+---
+**At-risk items** (stock = on hand, fc_3m = 3-month forecast, gap = units to order):
+{table}{note}
+"""
+
+
+def build_inventory_prompt(inventory, token_budget: int = None) -> InventoryPrompt:
+    """Encode inventory as a compact table of at-risk items within a token budget"""
+    if token_budget is None:
+        token_budget = api_settings.INVENTORY_PROMPT_TOKEN_BUDGET
+
+    now = datetime.now()
+    start_month = (now + relativedelta(months=1)).strftime("%B %Y")
+    end_month = (now + relativedelta(months=3)).strftime("%B %Y")
+    horizon_end = now + relativedelta(months=3)
+
+    total_revenue = sum(item["total_projected_revenue_3m"] for item in inventory)
+    total_profit = sum(item["total_projected_profit_3m"] for item in inventory)
+    top_item = max(
+        inventory,
+        key=lambda item: item["total_projected_profit_3m"],
+        default={"product_name": "-", "total_projected_profit_3m": 0.0},
+    )
+
+    at_risk = sorted(
+        (item for item in inventory if _is_at_risk(item, horizon_end)),
+        key=_risk_order,
+    )
+
+    def render(rows):
+        return _template(
+            start_month,
+            end_month,
+            total_revenue,
+            total_profit,
+            top_item,
+            rows,
+            len(at_risk) - len(rows),
+        )
+
+    # Each row costs about the same, so add rows until the budget is spent
+    # instead of re-rendering the whole prompt per item.
+    rows = []
+    used = estimate_tokens(render([]))
+    for item in at_risk:
+        row = _row(item)
+        cost = estimate_tokens(row + "\n")
+        if used + cost > token_budget:
+            break
+        rows.append(row)
+        used += cost
+
+    text = render(rows)
+
+    return InventoryPrompt(
+        text=text,
+        token_estimate=estimate_tokens(text),
+        total_items=len(inventory),
+        at_risk_items=len(at_risk),
+        included_items=len(rows),
+    )
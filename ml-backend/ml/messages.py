@@ -0,0 +1,9 @@
+def message_text(content) -> str:
+    """Flatten string or content-block message content into plain text"""
+    if isinstance(content, str):
+        return content
+
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content
+    )
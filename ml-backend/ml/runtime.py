@@ -0,0 +1,74 @@
+"""Shared ML/LLM runtime, imported and built on first use.
+
+torch, chronos, langchain, langgraph and pandas take seconds to import, so
+endpoint modules only reach them through these providers and the server can
+accept traffic before they are loaded.
+"""
+import logging
+import threading
+import time
+from functools import lru_cache
+from settings.settings import api_settings
+
+logger = logging.getLogger("sarah.runtime")
+
+_chat_model_lock = threading.Lock()
+_forecaster_lock = threading.Lock()
+
+warm_up_state = {"started_at": None, "finished_at": None, "error": None}
+
+
+@lru_cache
+def _build_chat_model():
+    from ml.chat_model import ChatModel
+
+    return ChatModel()
+
+
+@lru_cache
+def _build_forecaster():
+    # With a forecasting sidecar configured, all workers on the host share
+    # its model instead of loading their own.
+    if api_settings.FORECAST_SERVER_ADDRESS:
+        from ml.forecast_client import ForecastClient
+
+        return ForecastClient(api_settings.FORECAST_SERVER_ADDRESS)
+
+    from ml.demand_forecasting import ChronosForecaster
+
+    return ChronosForecaster()
+
+
+def get_chat_model():
+    """Shared chat runtime, built once per worker"""
+    with _chat_model_lock:
+        return _build_chat_model()
+
+
+def get_forecaster():
+    """Shared forecaster, so the Chronos model is loaded once per worker"""
+    with _forecaster_lock:
+        return _build_forecaster()
+
+
+def runtime_state() -> dict:
+    return {
+        "chat_model_loaded": _build_chat_model.cache_info().currsize > 0,
+        "forecaster_loaded": _build_forecaster.cache_info().currsize > 0,
+        **warm_up_state,
+    }
+
+
+def warm_up():
+    """Load the forecaster and chat runtime ahead of the first request that needs them"""
+    warm_up_state["started_at"] = time.time()
+    try:
+        get_forecaster()
+        get_chat_model()
+    except Exception as e:
+        # Requests retry the build on first use, so a failed warm-up only
+        # costs latency.
+        warm_up_state["error"] = str(e)
+        logger.exception("Runtime warm-up failed")
+    finally:
+        warm_up_state["finished_at"] = time.time()
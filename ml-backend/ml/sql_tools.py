@@ -0,0 +1,69 @@
+import re
+import hashlib
+from redis.exceptions import RedisError
+from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from settings.settings import api_settings
+from redis_client.data_version import DATA_VERSION_KEY
+from redis_client.connection import get_redis
+from observability.metrics import span
+
+WRITE_STATEMENT = re.compile(
+    r"\b(insert|update|delete|merge|drop|alter|create|truncate|grant|revoke|copy|vacuum)\b",
+    re.IGNORECASE,
+)
+
+_redis = get_redis()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def is_read_only(query: str) -> bool:
+    return (
+        query.lower().startswith(("select", "with"))
+        and ";" not in query
+        and WRITE_STATEMENT.search(query) is None
+    )
+
+
+class CachedQuerySQLDatabaseTool(QuerySQLDatabaseTool):
+    """sql_db_query that reuses results of identical read-only queries per data version"""
+
+    def _run(self, query: str, run_manager=None):
+        normalized = normalize_query(query)
+        if not is_read_only(normalized):
+            return super()._run(query, run_manager)
+
+        try:
+            version = int(_redis.get(DATA_VERSION_KEY) or 0)
+            digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+            key = f"sql:result:{version}:{digest}"
+
+            with span("redis_sql_cache"):
+                cached = _redis.get(key)
+            if cached is not None:
+                return cached
+
+        except RedisError:
+            return super()._run(query, run_manager)
+
+        result = super()._run(query, run_manager)
+
+        if isinstance(result, str) and not result.startswith("Error:"):
+            try:
+                _redis.set(key, result, ex=api_settings.SQL_RESULT_CACHE_TTL_SECONDS)
+            except RedisError:
+                pass
+
+        return result
+
+
+def cached_sql_tools(tools: list) -> list:
+    """Swap the toolkit's query tool for the caching one"""
+    return [
+        CachedQuerySQLDatabaseTool(db=tool.db, description=tool.description)
+        if isinstance(tool, QuerySQLDatabaseTool)
+        else tool
+        for tool in tools
+    ]
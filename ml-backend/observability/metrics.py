@@ -0,0 +1,140 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY = []
+
+# Spans recorded while handling the current request, for structured logs.
+request_spans: ContextVar[Optional[list]] = ContextVar("request_spans", default=None)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (buckets, total, count) in sorted(self._series.items()):
+                for bound, bucket in zip(self.buckets, buckets):
+                    lines.append(f"{self.name}_bucket{_labels(names, key + (bound,))} {bucket}")
+                lines.append(f"{self.name}_bucket{_labels(names, key + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class GaugeCollector:
+    """Gauges read from existing stats objects at scrape time"""
+
+    def __init__(self, name: str, help: str, labelnames: tuple, collect: Callable):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.collect = collect
+        REGISTRY.append(self)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in self.collect():
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+request_latency = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+stage_latency = Histogram(
+    "stage_duration_seconds",
+    "Time spent in instrumented stages (SQL, DataFrames, model inference, LLM and Redis calls)",
+    ("stage",),
+)
+stage_errors = Counter(
+    "stage_errors_total",
+    "Instrumented stages that raised",
+    ("stage",),
+)
+
+
+def record(stage: str, seconds: float):
+    stage_latency.observe(seconds, stage=stage)
+
+    spans = request_spans.get()
+    if spans is not None:
+        spans.append({"stage": stage, "ms": round(seconds * 1000, 2)})
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block of sync or async code as one stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    return "\n".join(lines) + "\n"
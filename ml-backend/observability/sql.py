@@ -0,0 +1,16 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from observability.metrics import record
+
+
+def instrument_engine(engine: Engine):
+    """Record every SQL statement executed on the engine as a "sql" stage"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        record("sql", time.perf_counter() - conn.info["query_start"].pop())
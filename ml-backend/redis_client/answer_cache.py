@@ -0,0 +1,168 @@
+import re
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from settings.settings import api_settings
+from redis_client.connection import get_async_binary_redis
+from observability.metrics import span
+
+logger = logging.getLogger("sarah.answer_cache")
+
+
+class AnswerCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+answer_cache_stats = AnswerCacheStats()
+
+
+@dataclass
+class CacheLookup:
+    answer: Optional[str] = None
+    # Embedding of the question, reused when the answer is stored.
+    vector: Optional[bytes] = None
+
+
+def _unit_vector(values: list) -> bytes:
+    import numpy as np
+
+    vector = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tobytes()
+
+
+def _best_match(vector: bytes, entries: list, threshold: float) -> Optional[str]:
+    """Key of the most similar stored question, if it clears the threshold"""
+    import numpy as np
+
+    query = np.frombuffer(vector, dtype=np.float32)
+    keys, rows = [], []
+    for entry in entries:
+        key, _, stored = entry.partition(b"\n")
+        if len(stored) == len(vector):
+            keys.append(key)
+            rows.append(stored)
+
+    if not rows:
+        return None
+
+    # Vectors are stored unit-length, so the dot product is the cosine.
+    scores = np.frombuffer(b"".join(rows), dtype=np.float32).reshape(len(rows), -1) @ query
+    best = int(scores.argmax())
+
+    return keys[best].decode("utf-8") if scores[best] >= threshold else None
+
+
+class ChatAnswerCache:
+    """Answers per intent and data version; any cache failure degrades to a miss"""
+
+    def __init__(self, embeddings=None):
+        self.redis = get_async_binary_redis()
+        self.embeddings = embeddings
+        self.ttl = api_settings.CHAT_CACHE_TTL_SECONDS
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        message = re.sub(r"[^\w\s]", " ", message.lower())
+        return " ".join(message.split())
+
+    def _key(self, message: str, intent: str, version: int) -> str:
+        digest = hashlib.sha256(self.normalize(message).encode("utf-8")).hexdigest()
+        return f"chat:answer:{intent}:{version}:{digest}"
+
+    def _vectors_key(self, intent: str, version: int) -> str:
+        return f"chat:answer:vectors:{intent}:{version}"
+
+    async def get(self, message: str, intent: str, version: int) -> CacheLookup:
+        """Look up an answer by exact normalized text, then by embedding similarity"""
+        lookup = CacheLookup()
+
+        try:
+            with span("redis_answer_cache"):
+                answer = await self.redis.get(self._key(message, intent, version))
+            if answer is not None:
+                answer_cache_stats.hits += 1
+                lookup.answer = answer.decode("utf-8")
+                return lookup
+
+            if self.embeddings is not None:
+                lookup.vector = await self._embed(message)
+                lookup.answer = await self._get_similar(lookup.vector, intent, version)
+                if lookup.answer is not None:
+                    answer_cache_stats.semantic_hits += 1
+                    return lookup
+
+        except Exception:
+            answer_cache_stats.errors += 1
+            logger.warning("Answer cache lookup failed", exc_info=True)
+
+        answer_cache_stats.misses += 1
+        return lookup
+
+    async def _embed(self, message: str) -> bytes:
+        with span("embedding_answer_cache"):
+            values = await self.embeddings.aembed_query(self.normalize(message))
+        return _unit_vector(values)
+
+    async def _get_similar(self, vector: bytes, intent: str, version: int):
+        with span("redis_answer_cache"):
+            entries = await self.redis.lrange(self._vectors_key(intent, version), 0, -1)
+        if not entries:
+            return None
+
+        with span("similarity_answer_cache"):
+            best_key = await asyncio.to_thread(
+                _best_match, vector, entries, api_settings.CHAT_CACHE_SIMILARITY_THRESHOLD
+            )
+        if best_key is None:
+            return None
+
+        with span("redis_answer_cache"):
+            answer = await self.redis.get(best_key)
+        return answer.decode("utf-8") if answer is not None else None
+
+    async def set(
+        self, message: str, intent: str, version: int, answer: str, vector: bytes = None
+    ):
+        """Store an answer for the current data version, in one round trip"""
+        key = self._key(message, intent, version)
+
+        try:
+            if self.embeddings is not None and vector is None:
+                vector = await self._embed(message)
+
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(key, answer, ex=self.ttl)
+
+            if vector is not None:
+                vectors_key = self._vectors_key(intent, version)
+                pipe.lpush(vectors_key, key.encode("utf-8") + b"\n" + vector)
+                pipe.ltrim(vectors_key, 0, api_settings.CHAT_CACHE_SEMANTIC_MAX_ENTRIES - 1)
+                pipe.expire(vectors_key, self.ttl)
+
+            with span("redis_answer_cache"):
+                await pipe.execute()
+            answer_cache_stats.stores += 1
+
+        except Exception:
+            answer_cache_stats.errors += 1
+            logger.warning("Answer cache store failed", exc_info=True)
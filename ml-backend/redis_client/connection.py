@@ -0,0 +1,44 @@
+import redis
+import redis.asyncio as aioredis
+from functools import lru_cache
+from settings.settings import api_settings
+
+
+@lru_cache
+def get_pool(decode_responses: bool = True) -> redis.ConnectionPool:
+    return redis.ConnectionPool(
+        host=api_settings.REDIS_HOST,
+        port=api_settings.REDIS_PORT,
+        max_connections=api_settings.REDIS_MAX_CONNECTIONS,
+        decode_responses=decode_responses,
+    )
+
+
+@lru_cache
+def get_async_pool(decode_responses: bool = True) -> aioredis.ConnectionPool:
+    return aioredis.ConnectionPool(
+        host=api_settings.REDIS_HOST,
+        port=api_settings.REDIS_PORT,
+        max_connections=api_settings.REDIS_MAX_CONNECTIONS,
+        decode_responses=decode_responses,
+    )
+
+
+def get_redis() -> redis.Redis:
+    """Client backed by the worker's shared connection pool"""
+    return redis.Redis(connection_pool=get_pool())
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Async client backed by the worker's shared connection pool"""
+    return aioredis.Redis(connection_pool=get_async_pool())
+
+
+def get_binary_redis() -> redis.Redis:
+    """Pooled client returning raw bytes, for binary-encoded values"""
+    return redis.Redis(connection_pool=get_pool(decode_responses=False))
+
+
+def get_async_binary_redis() -> aioredis.Redis:
+    """Pooled async client returning raw bytes, for binary-encoded values"""
+    return aioredis.Redis(connection_pool=get_async_pool(decode_responses=False))
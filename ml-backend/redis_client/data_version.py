@@ -0,0 +1,75 @@
+import time
+import asyncio
+from typing import Optional
+from redis.exceptions import WatchError
+from db.database import SessionLocal
+from db.data_upload import latest_upload
+from redis_client.connection import get_async_redis
+
+DATA_VERSION_KEY = "data:version"
+DATA_UPDATED_AT_KEY = "data:version:updated_at"
+
+
+def _durable_state() -> tuple[int, Optional[float]]:
+    db = SessionLocal()
+    try:
+        return latest_upload(db)
+    finally:
+        db.close()
+
+
+class DataVersion:
+    """Version of the uploaded product data, mirrored in Redis for cheap reads.
+
+    The source of truth is the id of the latest row in data_uploads, so the
+    Redis copy only ever moves forward to it. A lost or flushed key is
+    restored from the database instead of restarting at 0, where old ETags
+    and cache keys could match again.
+    """
+
+    def __init__(self):
+        self.redis = get_async_redis()
+
+    async def get(self) -> int:
+        """Current version of the uploaded product data"""
+        version, _ = await self.get_state()
+        return version
+
+    async def get_state(self) -> tuple[int, Optional[float]]:
+        """Current version and when it was last bumped, in one round trip"""
+        version, updated_at = await self.redis.mget(DATA_VERSION_KEY, DATA_UPDATED_AT_KEY)
+        if version is None:
+            return await self.sync()
+
+        return int(version), float(updated_at) if updated_at else None
+
+    async def sync(self) -> tuple[int, Optional[float]]:
+        """Bring the Redis copy up to the version recorded in the database"""
+        version, updated_at = await asyncio.to_thread(_durable_state)
+        return await self.advance(version, updated_at)
+
+    async def advance(
+        self, version: int, updated_at: float = None
+    ) -> tuple[int, Optional[float]]:
+        """Raise the version to at least `version`; it never goes backwards"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(DATA_VERSION_KEY, DATA_UPDATED_AT_KEY)
+                    current, current_at = await pipe.mget(
+                        DATA_VERSION_KEY, DATA_UPDATED_AT_KEY
+                    )
+                    if current is not None and int(current) >= version:
+                        return int(current), float(current_at) if current_at else None
+
+                    updated_at = updated_at or time.time()
+                    pipe.multi()
+                    pipe.set(DATA_VERSION_KEY, version)
+                    pipe.set(DATA_UPDATED_AT_KEY, updated_at)
+                    await pipe.execute()
+
+                    return version, updated_at
+
+                except WatchError:
+                    # A concurrent upload moved it; re-check against the new value.
+                    continue
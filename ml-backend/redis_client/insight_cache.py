@@ -0,0 +1,35 @@
+import json
+import hashlib
+from typing import Optional
+from settings.settings import api_settings
+from redis_client.connection import get_async_redis
+
+
+class InsightCache:
+    def __init__(self):
+        self.redis = get_async_redis()
+        self.ttl = api_settings.INSIGHT_CACHE_TTL_SECONDS
+        self.lock_ttl = api_settings.INSIGHT_LOCK_TTL_SECONDS
+
+    @staticmethod
+    def make_key(inventory: list, model: str) -> str:
+        """Hash the computed inventory payload together with the model name"""
+        payload = json.dumps(inventory, sort_keys=True, default=str)
+        digest = hashlib.sha256(f"{model}:{payload}".encode("utf-8")).hexdigest()
+        return f"inventory:insight:{digest}"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached summary, if any"""
+        return await self.redis.get(key)
+
+    async def set(self, key: str, summary: str):
+        """Store a generated summary"""
+        await self.redis.set(key, summary, ex=self.ttl)
+
+    async def acquire(self, key: str) -> bool:
+        """Claim generation of a summary across workers"""
+        return bool(await self.redis.set(f"{key}:lock", "1", nx=True, ex=self.lock_ttl))
+
+    async def release(self, key: str):
+        """Release the generation claim for a summary"""
+        await self.redis.delete(f"{key}:lock")
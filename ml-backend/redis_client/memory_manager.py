@@ -1,29 +1,74 @@
 import json
-import redis
-from typing import List, Dict
+import ormsgpack
+from typing import List, Dict, Optional
 from datetime import timedelta
+from settings.settings import api_settings
+from redis_client.connection import get_binary_redis, get_async_binary_redis
+
+
+def encode_message(message: Dict) -> bytes:
+    """Serialize a message with the configured encoding (JSON or msgpack)"""
+    if api_settings.CHAT_MESSAGE_ENCODING == "msgpack":
+        return ormsgpack.packb(message)
+
+    return json.dumps(message).encode("utf-8")
+
+
+def decode_message(raw: bytes) -> Dict:
+    """Deserialize a message stored in either encoding"""
+    if raw[:1] == b"{":
+        return json.loads(raw)
+
+    return ormsgpack.unpackb(raw)
+
+
+def _build_message(msg: Dict) -> Dict:
+    return {
+        "role": msg["role"],
+        "content": msg["content"],
+        "metadata": msg.get("metadata") or {},
+    }
 
 
 class ChatMemoryManager:
     def __init__(self):
-        self.redis = redis.Redis(host="redis", port=6379, decode_responses=True)
+        self.redis = get_binary_redis()
         self.message_ttl = timedelta(hours=24)
 
     def _get_session_key(self, session_id: str) -> str:
         """Generate Redis key for a chat session"""
         return f"chat:session:{session_id}"
 
+    def _get_summary_key(self, session_id: str) -> str:
+        """Generate Redis key for the rolling summary of a chat session"""
+        return f"chat:summary:{session_id}"
+
+    def _get_count_key(self, session_id: str) -> str:
+        """Generate Redis key for the number of messages ever added to a session"""
+        return f"chat:count:{session_id}"
+
     def add_message(
         self, session_id: str, role: str, content: str, metadata: Dict = None
     ):
         """Add a message to the chat history"""
-        key = self._get_session_key(session_id)
+        self.add_messages(
+            session_id, [{"role": role, "content": content, "metadata": metadata}]
+        )
 
-        message = {"role": role, "content": content, "metadata": metadata or {}}
+    def add_messages(self, session_id: str, messages: List[Dict]):
+        """Append messages and refresh the TTL in a single round trip"""
+        key = self._get_session_key(session_id)
+        count_key = self._get_count_key(session_id)
 
-        self.redis.rpush(key, json.dumps(message))
+        encoded = [encode_message(_build_message(msg)) for msg in messages]
 
-        self.redis.expire(key, self.message_ttl)
+        with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *encoded)
+            pipe.incrby(count_key, len(encoded))
+            pipe.expire(key, self.message_ttl)
+            pipe.expire(count_key, self.message_ttl)
+            pipe.expire(self._get_summary_key(session_id), self.message_ttl)
+            pipe.execute()
 
     def get_history(self, session_id: str) -> List[Dict]:
         """Retrieve full chat history for a session"""
@@ -31,7 +76,7 @@ class ChatMemoryManager:
 
         messages = self.redis.lrange(key, 0, -1)
 
-        return [json.loads(msg) for msg in messages]
+        return [decode_message(msg) for msg in messages]
 
     def get_formatted_history(self, session_id: str) -> str:
         """Get full chat history formatted for LLM context"""
@@ -45,10 +90,173 @@ class ChatMemoryManager:
 
     def clear_session(self, session_id: str):
         """Clear all messages for a session"""
-        key = self._get_session_key(session_id)
-        self.redis.delete(key)
+        self.redis.delete(
+            self._get_session_key(session_id),
+            self._get_summary_key(session_id),
+            self._get_count_key(session_id),
+        )
 
     def session_exists(self, session_id: str) -> bool:
         """Check if a session exists"""
         key = self._get_session_key(session_id)
         return self.redis.exists(key) > 0
+
+
+class AsyncChatMemoryManager:
+    def __init__(self):
+        self.redis = get_async_binary_redis()
+        self.message_ttl = timedelta(hours=24)
+
+    def _get_session_key(self, session_id: str) -> str:
+        """Generate Redis key for a chat session"""
+        return f"chat:session:{session_id}"
+
+    def _get_summary_key(self, session_id: str) -> str:
+        """Generate Redis key for the rolling summary of a chat session"""
+        return f"chat:summary:{session_id}"
+
+    def _get_count_key(self, session_id: str) -> str:
+        """Generate Redis key for the number of messages ever added to a session"""
+        return f"chat:count:{session_id}"
+
+    async def add_message(
+        self, session_id: str, role: str, content: str, metadata: Dict = None
+    ):
+        """Add a message to the chat history"""
+        await self.add_messages(
+            session_id, [{"role": role, "content": content, "metadata": metadata}]
+        )
+
+    async def add_messages(self, session_id: str, messages: List[Dict]):
+        """Append messages and refresh the TTL in a single round trip"""
+        key = self._get_session_key(session_id)
+        count_key = self._get_count_key(session_id)
+
+        encoded = [encode_message(_build_message(msg)) for msg in messages]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *encoded)
+            pipe.incrby(count_key, len(encoded))
+            pipe.expire(key, self.message_ttl)
+            pipe.expire(count_key, self.message_ttl)
+            pipe.expire(self._get_summary_key(session_id), self.message_ttl)
+            await pipe.execute()
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        """Retrieve full chat history for a session"""
+        key = self._get_session_key(session_id)
+
+        messages = await self.redis.lrange(key, 0, -1)
+
+        return [decode_message(msg) for msg in messages]
+
+    async def get_page(
+        self, session_id: str, limit: int, before: Optional[int] = None
+    ):
+        """Page of messages ending just before sequence number `before`, newest first
+
+        Sequence numbers count every message ever added to the session, so
+        cursors stay valid while new messages are appended or old ones are
+        trimmed. Returns the page in chronological order with each message's
+        `seq`, and the cursor for the next (older) page.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._get_count_key(session_id))
+            pipe.llen(self._get_session_key(session_id))
+            total, length = await pipe.execute()
+
+        total = int(total) if total is not None else length
+        first_seq = total - length
+
+        end_seq = total if before is None else min(before, total)
+        start_seq = max(end_seq - limit, first_seq)
+        if start_seq >= end_seq:
+            return [], None
+
+        messages = await self.redis.lrange(
+            self._get_session_key(session_id),
+            start_seq - first_seq,
+            end_seq - first_seq - 1,
+        )
+
+        page = [
+            {**decode_message(msg), "seq": seq}
+            for seq, msg in enumerate(messages, start=start_seq)
+        ]
+        next_cursor = start_seq if start_seq > first_seq else None
+
+        return page, next_cursor
+
+    async def get_counts(self, session_id: str):
+        """Stored and total message counts without loading any messages"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self._get_session_key(session_id))
+            pipe.get(self._get_count_key(session_id))
+            length, total = await pipe.execute()
+
+        return length, int(total) if total is not None else length
+
+    async def get_formatted_history(self, session_id: str) -> str:
+        """Get full chat history formatted for LLM context"""
+        history = await self.get_history(session_id)
+
+        formatted = []
+        for msg in history:
+            formatted.append(f"{msg['role'].upper()}: {msg['content']}")
+
+        return "\n".join(formatted)
+
+    async def clear_session(self, session_id: str):
+        """Clear all messages for a session"""
+        await self.redis.delete(
+            self._get_session_key(session_id),
+            self._get_summary_key(session_id),
+            self._get_count_key(session_id),
+        )
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Check if a session exists"""
+        key = self._get_session_key(session_id)
+        return await self.redis.exists(key) > 0
+
+    async def get_context(self, session_id: str, count: int):
+        """Rolling summary and the most recent messages, in one round trip"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._get_summary_key(session_id))
+            pipe.lrange(self._get_session_key(session_id), -count, -1)
+            summary, messages = await pipe.execute()
+
+        summary = summary.decode("utf-8") if summary is not None else None
+
+        return summary, [decode_message(msg) for msg in messages]
+
+    async def get_summary(self, session_id: str) -> Optional[str]:
+        """Rolling summary of the messages already dropped from a session"""
+        summary = await self.redis.get(self._get_summary_key(session_id))
+
+        return summary.decode("utf-8") if summary is not None else None
+
+    async def get_length(self, session_id: str) -> int:
+        """Number of stored messages for a session"""
+        return await self.redis.llen(self._get_session_key(session_id))
+
+    async def get_oldest(self, session_id: str, count: int) -> List[Dict]:
+        """Retrieve the oldest messages of a session"""
+        messages = await self.redis.lrange(self._get_session_key(session_id), 0, count - 1)
+
+        return [decode_message(msg) for msg in messages]
+
+    async def compact(self, session_id: str, summary: str, count: int):
+        """Store a new summary and drop the oldest messages it covers"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._get_summary_key(session_id), summary, ex=self.message_ttl)
+            pipe.ltrim(self._get_session_key(session_id), count, -1)
+            await pipe.execute()
+
+    async def acquire_compaction(self, session_id: str) -> bool:
+        """Claim summarization of a session so only one worker does it"""
+        key = f"{self._get_summary_key(session_id)}:lock"
+        return bool(await self.redis.set(key, "1", nx=True, ex=120))
+
+    async def release_compaction(self, session_id: str):
+        await self.redis.delete(f"{self._get_summary_key(session_id)}:lock")
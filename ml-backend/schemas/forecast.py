@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal
+
+
+class UnitsDataItem(BaseModel):
+    product_id: str
+    period: str
+    units_sold: int
+
+
+class UnitsPredictionItem(BaseModel):
+    product_id: str
+    period: str
+    target_name: Literal["units_sold"]
+    predictions: float
+    units_0_1: float
+    units_0_5: float
+    units_0_9: float
+
+
+class UnitsForecastResponse(BaseModel):
+    products_name: Dict[str, str]
+    data: List[UnitsDataItem]
+    prediction: List[UnitsPredictionItem]
+
+
+class RevenueDataItem(BaseModel):
+    product_id: str
+    period: str
+    revenue: float
+    units_sold: int
+
+
+class RevenuePredictionItem(BaseModel):
+    product_id: str
+    period: str
+    target_name: Literal["revenue"]
+    predictions: float
+    revenue_0_1: float
+    revenue_0_5: float
+    revenue_0_9: float = Field(alias="revenue_0.9")
+
+    model_config = {"populate_by_name": True}
+
+
+class RevenueForecastResponse(BaseModel):
+    products_name: Dict[str, str]
+    data: List[RevenueDataItem]
+    prediction: List[RevenuePredictionItem]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, computed_field
-from typing import Dict
+from typing import Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -41,6 +41,20 @@ class ProductDataResponse(ProductData):
     def Month(self) -> str:
         return datetime.strptime(self.period, "%Y-%m").strftime("%B")
 
+class InventoryItemResponse(ProductData):
+    id: UUID
+
+
+class InventoryPageResponse(BaseModel):
+    items: List[InventoryItemResponse]
+    next_cursor: Optional[str] = None
+
+
+class InventoryColumnsResponse(BaseModel):
+    count: int
+    columns: Dict[str, List]
+
+
 class MetricsResponse(BaseModel):
     monthly_revenue: Dict[str, float]
     units_sold: Dict[str, int]
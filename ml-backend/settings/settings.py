@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +11,53 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50
     GROQ_API_KEY: str
 
-api_settings = Settings()
\ No newline at end of file
+    INSIGHT_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    INSIGHT_LOCK_TTL_SECONDS: int = 120
+    INVENTORY_PROMPT_TOKEN_BUDGET: int = 1500
+
+    INTENT_FAST_PATH_THRESHOLD: float = 0.8
+    INTENT_SHADOW_SAMPLE_RATE: float = 0.0
+    INTENT_MODEL_PATH: str | None = None
+
+    CHAT_CACHE_TTL_SECONDS: int = 60 * 60 * 6
+    CHAT_CACHE_SEMANTIC: bool = False
+    CHAT_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    CHAT_CACHE_SEMANTIC_MAX_ENTRIES: int = 500
+
+    SQL_RESULT_CACHE_TTL_SECONDS: int = 60 * 60
+
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 2000
+    CHAT_HISTORY_MAX_MESSAGES: int = 40
+    CHAT_HISTORY_KEEP_MESSAGES: int = 20
+    CHAT_MESSAGE_ENCODING: Literal["json", "msgpack"] = "json"
+    CHAT_HISTORY_PAGE_SIZE: int = 50
+
+    ADMISSION_CHAT_CONCURRENCY: int = 8
+    ADMISSION_CHAT_QUEUE: int = 32
+    ADMISSION_INSIGHT_CONCURRENCY: int = 2
+    ADMISSION_INSIGHT_QUEUE: int = 8
+    ADMISSION_FORECAST_CONCURRENCY: int = 2
+    ADMISSION_FORECAST_QUEUE: int = 16
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 15
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    HTTP_CACHE_TTL_SECONDS: int = 60 * 60
+
+    REQUEST_LOG_JSON: bool = False
+
+    WARM_UP_ON_STARTUP: bool = True
+
+    FORECAST_SERVER_ADDRESS: str | None = None
+    FORECAST_SERVER_TIMEOUT_SECONDS: float = 60
+    FORECAST_BATCH_WINDOW_MS: int = 10
+    FORECAST_BATCH_MAX_SERIES: int = 512
+
+    FORECAST_CONTEXT_MONTHS: int = 36
+    FORECAST_MIN_HISTORY_MONTHS: int = 6
+    FORECAST_DEAD_MONTHS: int = 6
+    FORECAST_FILL_METHOD: Literal["zero", "ffill"] = "zero"
+
+api_settings = Settings()